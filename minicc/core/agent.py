@@ -4,41 +4,62 @@ MiniCC Agent 创建与运行
 
 from __future__ import annotations
 
+import hashlib
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any
 
-from pydantic_ai import Agent
+from pydantic_ai import Agent, Tool
+from pydantic_ai.messages import ModelMessagesTypeAdapter
+from pydantic_ai.models import Model
 from pydantic_ai.models.anthropic import AnthropicModel
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.anthropic import AnthropicProvider
 from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.toolsets import AbstractToolset
+from pydantic_ai.toolsets import AbstractToolset, FunctionToolset
 
 from .config import get_api_key, load_agents_prompt
 from .mcp import load_mcp_toolsets
-from .models import Config, MiniCCDeps, Provider
+from .models import Config, MiniCCDeps, PromptCache, Provider
+
+# run_agent 响应缓存（LRU，仅在 config.response_cache=True 时启用）
+_RESPONSE_CACHE_SIZE = 128
+_RESPONSE_CACHE: OrderedDict[bytes, tuple[str, list]] = OrderedDict()
 
 
 def create_model(config: Config) -> AnthropicModel | OpenAIModel | str:
     api_key = get_api_key(config.provider)
 
     if config.base_url or config.api_key:
-        if config.provider == Provider.ANTHROPIC:
-            provider = AnthropicProvider(api_key=api_key, base_url=config.base_url)
-            return AnthropicModel(config.model, provider=provider)
-        provider = OpenAIProvider(api_key=api_key, base_url=config.base_url)
-        return OpenAIModel(config.model, provider=provider)
+        return _build_model(config.provider, config.model, config.base_url, api_key)
 
     if config.provider == Provider.ANTHROPIC:
         return f"anthropic:{config.model}"
     return f"openai:{config.model}"
 
 
+@lru_cache(maxsize=8)
+def _build_model(
+    provider: Provider, model_name: str, base_url: str | None, api_key: str
+) -> AnthropicModel | OpenAIModel:
+    """相同参数复用同一个 Model（及其 HTTP 客户端），避免每次创建 Agent 都重新构造 provider"""
+    if provider == Provider.ANTHROPIC:
+        return AnthropicModel(model_name, provider=AnthropicProvider(api_key=api_key, base_url=base_url))
+    return OpenAIModel(model_name, provider=OpenAIProvider(api_key=api_key, base_url=base_url))
+
+
 def _build_model_settings(config: Config) -> dict[str, Any] | None:
-    if config.provider != Provider.ANTHROPIC:
+    return _model_settings_for(config.provider, config.prompt_cache)
+
+
+@lru_cache(maxsize=8)
+def _model_settings_for(provider: Provider, cache: PromptCache) -> dict[str, Any] | None:
+    """按 (provider, prompt_cache) 缓存 model settings；返回值为共享对象，调用方不应修改"""
+    if provider != Provider.ANTHROPIC:
         return None
 
-    cache = config.prompt_cache
     settings: dict[str, Any] = {}
     if cache.instructions:
         settings["anthropic_cache_instructions"] = cache.instructions
@@ -54,14 +75,14 @@ def create_agent(
     *,
     cwd: str | Path | None = None,
     toolsets: list[AbstractToolset[Any]] | None = None,
-    register_tools: Callable[[Agent[MiniCCDeps, str]], None] | None = None,
+    tools: Sequence[Tool[MiniCCDeps]] = (),
 ) -> Agent[MiniCCDeps, str]:
     """
     创建并配置主 Agent
 
     说明：
     - MCP toolsets 默认在此处加载，但 TUI 运行时会在启动阶段预加载并传入（避免重复加载）。
-    - 工具注册通过 register_tools 回调注入（便于拆分 tools 模块）。
+    - 内置工具由调用方通过 tools 传入（便于拆分 tools 模块）。
     """
 
     model = create_model(config)
@@ -76,13 +97,46 @@ def create_agent(
         deps_type=MiniCCDeps,
         system_prompt=system_prompt,
         model_settings=model_settings,
+        tools=tools,
         toolsets=toolsets,
     )
+    return agent
 
-    if register_tools is not None:
-        register_tools(agent)
 
-    return agent
+def _model_id(agent: Agent[MiniCCDeps, str]) -> str:
+    model = agent.model
+    if isinstance(model, Model):
+        return f"{model.system}:{model.model_name}"
+    return str(model)
+
+
+def _tool_signature(agent: Agent[MiniCCDeps, str]) -> str:
+    """Agent 可用工具的标识：函数工具按名称，其他 toolset（如 MCP server）按 label"""
+    parts: list[str] = []
+    for toolset in agent.toolsets:
+        if isinstance(toolset, FunctionToolset):
+            parts.extend(toolset.tools)
+        else:
+            parts.append(toolset.label)
+    return "\n".join(parts)
+
+
+def _response_cache_key(agent: Agent[MiniCCDeps, str], prompt: str, message_history: list, cwd: str) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_model_id(agent).encode("utf-8"))
+    h.update(b"\0")
+    # 同一 prompt 在不同项目目录、不同工具集下的回答不能互相复用
+    h.update(cwd.encode("utf-8"))
+    h.update(b"\0")
+    h.update(_tool_signature(agent).encode("utf-8"))
+    h.update(b"\0")
+    h.update(load_agents_prompt().encode("utf-8"))
+    h.update(b"\0")
+    h.update(prompt.encode("utf-8"))
+    h.update(b"\0")
+    if message_history:
+        h.update(ModelMessagesTypeAdapter.dump_json(message_history))
+    return h.digest()
 
 
 async def run_agent(
@@ -91,5 +145,28 @@ async def run_agent(
     deps: MiniCCDeps,
     message_history: list | None = None,
 ) -> tuple[str, list]:
-    result = await agent.run(prompt, deps=deps, message_history=message_history or [])
-    return result.output, result.all_messages()
+    """
+    运行 Agent 并返回 (output, all_messages)
+
+    config.response_cache=True 时，对相同 (模型, 工作目录, 工具集, 系统提示词, prompt, 历史消息) 的请求直接返回缓存结果；
+    注意工具调用的副作用不会重放，仅适用于幂等请求。
+    """
+    history = message_history or []
+    use_cache = deps.config.response_cache
+    key = _response_cache_key(agent, prompt, history, deps.cwd) if use_cache else b""
+
+    if use_cache:
+        cached = _RESPONSE_CACHE.get(key)
+        if cached is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+            output, messages = cached
+            return output, list(messages)
+
+    result = await agent.run(prompt, deps=deps, message_history=history)
+    output, messages = result.output, result.all_messages()
+
+    if use_cache:
+        _RESPONSE_CACHE[key] = (output, list(messages))
+        if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+    return output, messages
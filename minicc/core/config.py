@@ -7,9 +7,12 @@ MiniCC 配置管理
 from __future__ import annotations
 
 import os
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 
-from .models import Config, Provider
+from . import jsonio
+from .models import Config, PromptCache, Provider
 
 # 配置文件路径
 CONFIG_DIR = Path.home() / ".minicc"
@@ -39,20 +42,71 @@ def ensure_config_dir() -> None:
         AGENTS_FILE.write_text(_load_builtin_prompt(), encoding="utf-8")
 
 
-def load_config() -> Config:
+def load_config(validate: bool = False) -> Config:
+    """
+    读取配置文件。
+
+    配置文件由本程序生成、视为可信：默认走 model_construct 快速路径跳过校验；
+    结构不符合预期（未知字段/非法 provider 等）或 validate=True 时走完整校验。
+    """
     ensure_config_dir()
     if CONFIG_FILE.exists():
-        content = CONFIG_FILE.read_text(encoding="utf-8")
+        content = CONFIG_FILE.read_bytes()
+        if not validate:
+            try:
+                return _construct_trusted_config(jsonio.loads(content))
+            except (TypeError, ValueError):
+                pass
         return Config.model_validate_json(content)
     return Config()
 
 
+def _is_optional_str(value: object) -> bool:
+    return value is None or isinstance(value, str)
+
+
+def _is_cache_ttl(value: object) -> bool:
+    return isinstance(value, bool) or value in ("5m", "1h")
+
+
+# model_construct 不做校验：快速路径上逐字段检查类型与约束，任一不符即回退完整校验
+_TRUSTED_FIELD_CHECKS: dict[str, Callable[[object], bool]] = {
+    "model": lambda v: isinstance(v, str),
+    "api_key": _is_optional_str,
+    "base_url": _is_optional_str,
+    "response_cache": lambda v: isinstance(v, bool),
+    "subagent_concurrency": lambda v: type(v) is int and v >= 1,
+}
+
+
+def _construct_trusted_config(data: object) -> Config:
+    if not isinstance(data, dict) or not data.keys() <= Config.model_fields.keys():
+        raise ValueError("unexpected config fields")
+
+    values = dict(data)
+    for name, check in _TRUSTED_FIELD_CHECKS.items():
+        if name in values and not check(values[name]):
+            raise ValueError(f"unexpected value for {name}")
+    if "provider" in values:
+        values["provider"] = Provider(values["provider"])
+    if "prompt_cache" in values:
+        cache = values["prompt_cache"]
+        if not isinstance(cache, dict) or not cache.keys() <= PromptCache.model_fields.keys():
+            raise ValueError("unexpected prompt_cache fields")
+        if not all(_is_cache_ttl(v) for v in cache.values()):
+            raise ValueError("unexpected prompt_cache value")
+        values["prompt_cache"] = PromptCache.model_construct(**cache)
+    return Config.model_construct(**values)
+
+
 def save_config(config: Config) -> None:
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     CONFIG_FILE.write_text(config.model_dump_json(indent=2), encoding="utf-8")
 
 
+@lru_cache(maxsize=1)
 def load_agents_prompt() -> str:
+    """读取系统提示词；每个进程只读一次（修改 AGENTS.md 后需重启，或调用 load_agents_prompt.cache_clear()）"""
     ensure_config_dir()
     if AGENTS_FILE.exists():
         return AGENTS_FILE.read_text(encoding="utf-8")
@@ -19,6 +19,13 @@ class EventBus(Generic[T]):
     async def next(self) -> T:
         return await self._queue.get()
 
+    def drain(self) -> list[T]:
+        """取出当前已入队的全部事件（不等待）"""
+        events: list[T] = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
     async def iter(self) -> AsyncIterator[T]:
         while True:
             yield await self.next()
@@ -0,0 +1,33 @@
+"""
+MiniCC JSON 编解码
+
+安装了可选依赖 orjson（`pip install minicc[speedups]`）时使用其 C 实现，否则回退到标准库 json。
+两种实现的输出一致：非 ASCII 字符原样输出（等价于 ensure_ascii=False），
+紧凑格式不带空格（与 orjson 相同），indent=True 时为 2 空格缩进。
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于运行环境
+    orjson = None
+
+
+def loads(data: str | bytes) -> Any:
+    """解析 JSON；解析失败抛出 json.JSONDecodeError（orjson 的异常是其子类）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False) -> str:
+    """序列化为 JSON 字符串；indent=True 时使用 2 空格缩进"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
@@ -2,12 +2,15 @@
 MiniCC 日志模块
 
 提供会话日志记录功能，每次会话在 ~/.minicc/log 下创建独立的会话目录。
+日志写入由后台线程完成，调用方（通常是 UI 事件循环）只负责入队，不会阻塞在磁盘 I/O 上。
 """
 
 from __future__ import annotations
 
+import atexit
+import queue
 import threading
-from datetime import datetime
+import time
 from pathlib import Path
 
 
@@ -28,7 +31,12 @@ class Logger:
         self._session_id = session_id
         self._session_dir: Path | None = None
         self._log_file: Path | None = None
-        self._lock = threading.Lock()
+        # 队列元素：日志行 str / flush 通知 threading.Event / 关闭哨兵 None
+        self._q: queue.SimpleQueue[str | threading.Event | None] = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._closed = False
+        # 时间戳前缀缓存：(秒, "YYYY-mm-dd HH:MM:SS")，同一秒内只需拼接毫秒
+        self._ts_cache: tuple[int, str] = (-1, "")
         self._init_session()
 
     def _init_session(self) -> None:
@@ -41,6 +49,62 @@ class Logger:
 
         self._log_file = self._session_dir / self.LOG_FILE_NAME
 
+        # 文件句柄由后台写线程独占，会话期间保持常开
+        fh = open(self._log_file, "a", encoding="utf-8", buffering=8192)
+        self._writer = threading.Thread(
+            target=self._drain, args=(fh,), name=f"minicc-log-{self._session_id}", daemon=True
+        )
+        self._writer.start()
+        # 写线程是 daemon：未走 close() 的退出路径（异常、Ctrl-C、非 TUI 入口）也要写完剩余日志
+        atexit.register(self.close)
+
+    def _drain(self, fh) -> None:
+        """后台写线程：批量取出队列中的日志行写入文件，队列空闲时 flush"""
+        waiters: list[threading.Event] = []
+        try:
+            while True:
+                item = self._q.get()
+                lines: list[str] = []
+                waiters = []
+                stop = False
+                # 尽可能多地取出已入队的条目，合并为一次 writelines
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        lines.append(item)
+                    try:
+                        item = self._q.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if lines:
+                    fh.writelines(lines)
+                fh.flush()
+                for w in waiters:
+                    w.set()
+                if stop:
+                    return
+        except Exception:
+            # 写入失败（磁盘满、权限变化等）后不再接收日志，避免队列无限增长；唤醒所有等待 flush 的调用方
+            self._closed = True
+            while True:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+            for w in waiters:
+                w.set()
+        finally:
+            try:
+                fh.close()
+            except Exception:
+                pass
+
     @property
     def session_id(self) -> str:
         """获取会话 ID"""
@@ -63,16 +127,36 @@ class Logger:
         Args:
             message: 要写入的日志消息
         """
-        if self._log_file is None:
+        if self._writer is None or self._closed:
             return
 
-        # 获取当前时间
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-
-        # 格式化日志行
-        log_line = f"[{timestamp}] {message}\n"
+        # 获取当前时间（秒级前缀按秒缓存，避免每行构造 datetime + strftime）
+        ns = time.time_ns()
+        sec = ns // 1_000_000_000
+        cached_sec, prefix = self._ts_cache
+        if sec != cached_sec:
+            prefix = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+            self._ts_cache = (sec, prefix)
+        ms = (ns // 1_000_000) % 1000
+
+        # 格式化日志行，交给后台线程写入
+        self._q.put_nowait(f"[{prefix}.{ms:03d}] {message}\n")
+
+    def flush(self, timeout: float | None = 5.0) -> None:
+        """等待已入队的日志全部写入磁盘"""
+        if self._writer is None or self._closed:
+            return
+        done = threading.Event()
+        self._q.put_nowait(done)
+        done.wait(timeout)
 
-        # 追加写入日志文件
-        with self._lock:
-            with open(self._log_file, "a", encoding="utf-8") as f:
-                f.write(log_line)
+    def close(self, timeout: float | None = 5.0) -> None:
+        """写完剩余日志并停止后台线程（可重复调用）"""
+        if self._writer is None:
+            return
+        atexit.unregister(self.close)
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put_nowait(None)
+        self._writer.join(timeout)
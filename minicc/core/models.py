@@ -6,11 +6,12 @@ MiniCC 数据模型定义
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Provider(str, Enum):
@@ -25,21 +26,30 @@ class PromptCache(BaseModel):
     Anthropic Prompt Cache 配置
 
     每个字段支持 bool（True=5m TTL）或 '5m'/'1h'。
+    不可变（可哈希），便于按配置缓存派生的 model settings。
     """
 
+    model_config = ConfigDict(frozen=True)
+
     instructions: bool | Literal["5m", "1h"] = False
     messages: bool | Literal["5m", "1h"] = False
     tool_definitions: bool | Literal["5m", "1h"] = False
 
 
 class Config(BaseModel):
-    """应用配置结构（~/.minicc/config.json）。"""
+    """应用配置结构（~/.minicc/config.json）。不可变，修改请使用 model_copy(update=...)。"""
+
+    model_config = ConfigDict(frozen=True)
 
     provider: Provider = Provider.ANTHROPIC
     model: str = "claude-sonnet-4-20250514"
     api_key: Optional[str] = None
     base_url: Optional[str] = None
     prompt_cache: PromptCache = Field(default_factory=PromptCache)
+    # run_agent 进程内响应缓存（相同请求直接返回上次结果，默认关闭）
+    response_cache: bool = False
+    # 同时运行的顶层子代理上限（task(wait=False) 派生再多，也按此并发度排队执行）
+    subagent_concurrency: int = Field(default=4, ge=1)
 
 
 class ToolResult(BaseModel):
@@ -71,13 +81,35 @@ class TodoItem(BaseModel):
     active_form: str
 
 
+MAX_SHELL_OUTPUT_BYTES = 1_048_576
+
+
 class BackgroundShell(BaseModel):
+    """后台命令状态；输出按块保存在有上限的缓冲中，超出时丢弃最早的块。"""
+
     shell_id: str
     command: str
     description: str = ""
-    output_buffer: str = ""
+    output_chunks: deque[bytes] = Field(default_factory=deque)
+    output_bytes: int = 0
+    dropped_bytes: int = 0
     is_running: bool = True
 
+    def append_output(self, chunk: bytes) -> None:
+        self.output_chunks.append(chunk)
+        self.output_bytes += len(chunk)
+        while self.output_bytes > MAX_SHELL_OUTPUT_BYTES and len(self.output_chunks) > 1:
+            oldest = self.output_chunks.popleft()
+            self.output_bytes -= len(oldest)
+            self.dropped_bytes += len(oldest)
+
+    @property
+    def output_buffer(self) -> str:
+        text = b"".join(self.output_chunks).decode("utf-8", errors="replace")
+        if self.dropped_bytes:
+            return f"... 早期输出已丢弃（{self.dropped_bytes} 字节）\n{text}"
+        return text
+
 
 class QuestionOption(BaseModel):
     label: str
@@ -104,13 +136,14 @@ class UserCancelledError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class MiniCCDeps:
     """
     Agent 依赖注入容器（RunContext.deps）
 
     说明：与旧版本不同，本版本不再通过 on_tool_call 等回调耦合 UI，
     统一改为事件总线（core.events）。
+    使用 slots：所有属性必须在此声明，不能动态挂载新属性。
     """
 
     config: Config
@@ -121,6 +154,7 @@ class MiniCCDeps:
     background_shells: dict[str, tuple[Any, BackgroundShell]] = field(default_factory=dict)
     sub_agents: dict[str, AgentTask] = field(default_factory=dict)
     sub_agent_tasks: dict[str, Any] = field(default_factory=dict)
+    shell_pool: Any = None  # tools.shell.ShellPool（首次前台 bash 调用时创建）
 
     # 由运行时注入（避免 tools 直接依赖 Textual）
     event_bus: Any = None  # core.events.EventBus
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
 from dataclasses import dataclass
-from datetime import datetime
+from typing import Any, Callable
 
 from agent_gear import FileSystem
 
@@ -13,12 +16,82 @@ from minicc.core.mcp import load_mcp_toolsets
 from minicc.core.models import Config, MiniCCDeps
 from minicc.core.services.ask_user import AskUserService
 from minicc.core.services.subagents import SubAgentService
-from minicc.tools import register_tools
+from minicc.tools import build_tools
 
 
 def _generate_session_id() -> str:
-    """生成会话 ID"""
-    return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    """生成会话 ID（格式：YYYYmmdd_HHMMSS_微秒）"""
+    ns = time.time_ns()
+    prefix = time.strftime("%Y%m%d_%H%M%S", time.localtime(ns // 1_000_000_000))
+    return f"{prefix}_{(ns // 1000) % 1_000_000:06d}"
+
+
+class LazyFileSystem:
+    """
+    agent_gear.FileSystem 的惰性代理
+
+    首次使用时才创建 FileSystem（建立索引 + 文件监听）并等待索引就绪；
+    纯问答、不使用文件工具的会话因此不会产生启动 I/O。
+    创建过程是同步阻塞的：事件循环上请用 await aget()，get() 只在线程中调用；
+    属性访问只转发给已创建的实例，不会触发创建。
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], FileSystem],
+        ready_timeout: float = 30.0,
+        logger: Logger | None = None,
+    ) -> None:
+        self._factory = factory
+        self._ready_timeout = ready_timeout
+        self._logger = logger
+        self._fs: FileSystem | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """FileSystem 是否已创建"""
+        return self._fs is not None
+
+    def get(self) -> FileSystem:
+        """创建（如需要）并返回 FileSystem；可能阻塞数秒"""
+        fs = self._fs
+        if fs is not None:
+            return fs
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("FileSystem 已关闭")
+            if self._fs is None:
+                fs = self._factory()
+                try:
+                    fs.wait_ready(timeout=self._ready_timeout)
+                except Exception as e:
+                    # 索引未就绪时仍可使用（glob 等结果可能不完整），但必须留下记录
+                    if self._logger is not None:
+                        self._logger.print(f"[FS] Index not ready: {type(e).__name__}: {e}")
+                self._fs = fs
+            return self._fs
+
+    async def aget(self) -> FileSystem:
+        """get() 的异步版本：尚未创建时放到线程中执行，不阻塞事件循环"""
+        fs = self._fs
+        if fs is not None:
+            return fs
+        return await asyncio.to_thread(self.get)
+
+    def __getattr__(self, name: str) -> Any:
+        fs = self._fs
+        if fs is None:
+            raise RuntimeError("FileSystem 尚未创建，请先调用 aget()/get()")
+        return getattr(fs, name)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            fs, self._fs = self._fs, None
+        if fs is not None:
+            fs.close()
 
 
 @dataclass
@@ -29,15 +102,21 @@ class MiniCCRuntime:
     deps: MiniCCDeps
     agent: object
     event_bus: EventBus
-    fs: FileSystem
+    fs: LazyFileSystem
     toolsets: list
     logger: Logger
 
     def close(self) -> None:
+        if self.deps.shell_pool is not None:
+            self.deps.shell_pool.close()
         try:
             self.fs.close()
         except Exception:
             pass
+        try:
+            self.logger.close()
+        except Exception:
+            pass
 
 
 def build_runtime(config: Config | None = None, cwd: str | None = None) -> MiniCCRuntime:
@@ -48,19 +127,32 @@ def build_runtime(config: Config | None = None, cwd: str | None = None) -> MiniC
     event_bus: EventBus = EventBus()
     toolsets = load_mcp_toolsets(cwd)
 
-    fs = FileSystem(cwd, auto_watch=True)
     logger = Logger(session_id)
+    # 文件工具总是注册，FileSystem 一旦创建就会被它们使用；保留文件监听，
+    # 否则 bash 等外部修改不会反映到索引中（glob 结果过期）。惰性创建已避免纯问答会话的监听开销。
+    fs = LazyFileSystem(lambda: FileSystem(cwd, auto_watch=True), logger=logger)
 
     deps = MiniCCDeps(config=cfg, cwd=cwd, fs=fs, logger=logger)
     deps.event_bus = event_bus
     deps.ask_user_service = AskUserService(event_bus)
 
+    # 子代理共用一个 Agent：首次派生时创建，之后复用（Agent 本身不持有单次运行的状态）
+    subagent: object | None = None
+
     def _subagent_factory():
-        return create_agent(cfg, cwd=cwd, toolsets=toolsets, register_tools=register_tools)
+        nonlocal subagent
+        if subagent is None:
+            subagent = create_agent(cfg, cwd=cwd, toolsets=toolsets, tools=build_tools())
+        return subagent
 
-    deps.subagent_service = SubAgentService(deps=deps, event_bus=event_bus, agent_factory=_subagent_factory)
+    deps.subagent_service = SubAgentService(
+        deps=deps,
+        event_bus=event_bus,
+        agent_factory=_subagent_factory,
+        max_concurrency=cfg.subagent_concurrency,
+    )
 
-    agent = create_agent(cfg, cwd=cwd, toolsets=toolsets, register_tools=register_tools)
+    agent = create_agent(cfg, cwd=cwd, toolsets=toolsets, tools=build_tools())
     return MiniCCRuntime(
         config=cfg,
         cwd=cwd,
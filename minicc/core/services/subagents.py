@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+from contextvars import ContextVar
+from dataclasses import dataclass, field
 from typing import Any, Callable
 from uuid import uuid4
 
@@ -10,12 +11,21 @@ from pydantic_ai import Agent
 from minicc.core.events import SubAgentCreated, SubAgentUpdated
 from minicc.core.models import AgentTask, MiniCCDeps
 
+# 当前协程是否运行在某个子代理内部（asyncio.create_task 会继承该上下文）
+_IN_SUBAGENT: ContextVar[bool] = ContextVar("minicc_in_subagent", default=False)
+
 
 @dataclass
 class SubAgentService:
     deps: MiniCCDeps
     event_bus: Any
     agent_factory: Callable[[], Agent[MiniCCDeps, str]]
+    # 同时运行的顶层子代理上限（避免触发 provider 限流）
+    max_concurrency: int = 4
+    _slots: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._slots = asyncio.Semaphore(max(1, self.max_concurrency))
 
     async def run(
         self,
@@ -30,6 +40,9 @@ class SubAgentService:
 
         - background=True：后台启动，立即返回 task_id。
         - background=False：等待执行完成后返回 (task_id, result)。
+
+        运行在事件循环上：派生阶段只做登记与事件派发，不得引入同步阻塞的准备工作
+        （模型/系统提示词已按配置缓存，耗时部分都在 agent.run 的 await 中）。
         """
         task_id = uuid4().hex[:8]
         task_obj = AgentTask(
@@ -53,6 +66,18 @@ class SubAgentService:
         return task_id, task_obj.result
 
     async def _run(self, task_obj: AgentTask) -> None:
+        # 子代理内部再派生的子代理不占用名额：父任务持有名额并等待子任务，否则可能互相等待而死锁
+        if _IN_SUBAGENT.get():
+            await self._run_inner(task_obj)
+            return
+        async with self._slots:
+            token = _IN_SUBAGENT.set(True)
+            try:
+                await self._run_inner(task_obj)
+            finally:
+                _IN_SUBAGENT.reset(token)
+
+    async def _run_inner(self, task_obj: AgentTask) -> None:
         task_obj.status = "running"
         self.event_bus.emit(SubAgentUpdated(task_id=task_obj.task_id, status="running"))
 
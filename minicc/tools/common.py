@@ -1,68 +1,197 @@
 from __future__ import annotations
 
 import difflib
+import os
+import re
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from functools import lru_cache
 from pathlib import Path
+from typing import Any
 
-from minicc.core.models import DiffLine
+from minicc.core.models import DiffLine, MiniCCDeps
+
+try:
+    # 可选：rapidfuzz 的 C++ 实现计算行级 opcodes，未安装时回退 difflib
+    from rapidfuzz.distance import Indel as _Indel
+except ImportError:  # pragma: no cover - 取决于运行环境
+    _Indel = None
 
 DEFAULT_READ_LIMIT = 2000
 MAX_OUTPUT_CHARS = 30000
 DEFAULT_BASH_TIMEOUT_MS = 120000
 
 
+@lru_cache(maxsize=32)
+def cwd_path(cwd: str) -> Path:
+    """cwd 在一次会话内基本不变，缓存其 Path 对象避免每次调用重新解析。"""
+    return Path(cwd)
+
+
+async def load_fs(deps: MiniCCDeps) -> Any:
+    """返回 deps.fs；运行时注入的惰性代理尚未创建时，在线程中创建（建立索引可能耗时数秒）"""
+    fs = deps.fs
+    aget = getattr(fs, "aget", None)
+    return await aget() if aget is not None else fs
+
+
 def resolve_path(cwd: str, path: str) -> Path:
     p = Path(path)
     if p.is_absolute():
         return p
-    return Path(cwd) / p
+    return cwd_path(cwd) / p
+
+
+def relative_to_cwd(cwd: str, path: Path) -> str:
+    """返回 path 相对 cwd 的字符串；用前缀比较代替 Path.relative_to，不在 cwd 下时抛 ValueError。"""
+    text = str(path)
+    base = str(cwd_path(cwd))
+    prefix = base if base.endswith(os.sep) else base + os.sep
+    if text.startswith(prefix):
+        return text[len(prefix) :]
+    if text == base:
+        return "."
+    raise ValueError(f"{text!r} is not in the subpath of {base!r}")
+
+
+@lru_cache(maxsize=256)
+def compile_regex(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    """编译并缓存正则；轮询 bash_output / 重复 grep 时避免重复编译。无效正则抛 re.error。"""
+    return re.compile(pattern, flags)
+
+
+def _normalized_lines(text: str) -> list[str]:
+    # 整段替换制表符 + map(str.rstrip)：都在 C 层完成，比逐行 Python 处理或 re.sub 更快
+    return list(map(str.rstrip, text.replace("\t", "    ").split("\n")))
 
 
 def normalize_whitespace(text: str) -> str:
-    text = text.replace("\t", "    ")
-    lines = [line.rstrip() for line in text.split("\n")]
-    return "\n".join(lines)
+    return "\n".join(_normalized_lines(text))
 
 
 def find_whitespace_tolerant(content: str, normalized_pattern: str) -> str | None:
+    """在 content 中查找与 normalized_pattern 逐行（忽略空白差异）匹配的原文片段。
+
+    content 只规范化一次，再用 str.find 在整块文本上查找，命中必须落在行边界上；
+    通过行起始偏移表把命中位置映射回原始行。
+    """
     content_lines = content.split("\n")
-    pattern_lines = normalized_pattern.split("\n")
-    pattern_len = len(pattern_lines)
-
-    for i in range(len(content_lines) - pattern_len + 1):
-        window = content_lines[i : i + pattern_len]
-        normalized_window = [normalize_whitespace(line) for line in window]
-        if "\n".join(normalized_window) == normalized_pattern:
-            return "\n".join(window)
+    normalized_lines = _normalized_lines(content)
+    blob = "\n".join(normalized_lines)
+
+    line_starts: list[int] = []
+    offset = 0
+    for line in normalized_lines:
+        line_starts.append(offset)
+        offset += len(line) + 1
+
+    pattern_len = normalized_pattern.count("\n") + 1
+    size = len(normalized_pattern)
+    idx = blob.find(normalized_pattern)
+    while idx != -1:
+        end = idx + size
+        if (idx == 0 or blob[idx - 1] == "\n") and (end == len(blob) or blob[end] == "\n"):
+            start_line = bisect_left(line_starts, idx)
+            return "\n".join(content_lines[start_line : start_line + pattern_len])
+        idx = blob.find(normalized_pattern, idx + 1)
     return None
 
 
+Opcode = tuple[str, int, int, int, int]
+
+
+def _diff_opcodes(a: Sequence[str], b: Sequence[str]) -> list[Opcode]:
+    """计算行级 opcodes；有 rapidfuzz 时走 C++ 实现，相邻的删/增合并为 replace。"""
+    if _Indel is None:
+        # autojunk 会把高频行（如空行、括号）当作垃圾，大文件上反而退化
+        return difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+
+    merged: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in _Indel.opcodes(a, b):
+        if tag != "equal" and merged and merged[-1][0] != "equal":
+            _, pi1, _, pj1, _ = merged[-1]
+            merged[-1] = ("replace", pi1, i2, pj1, j2)
+        else:
+            merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+def _group_opcodes(codes: list[Opcode], n: int = 3) -> Iterator[list[Opcode]]:
+    """与 SequenceMatcher.get_grouped_opcodes 相同的分组逻辑（每组保留 n 行上下文）。"""
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    codes = list(codes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
 def generate_unified_diff(old: str, new: str, filename: str = "") -> str:
+    """生成 unified diff 文本，输出格式与 difflib.unified_diff 一致。"""
     old_lines = old.splitlines(keepends=True)
     new_lines = new.splitlines(keepends=True)
-    diff = difflib.unified_diff(
-        old_lines,
-        new_lines,
-        fromfile=f"a/{filename}" if filename else "a",
-        tofile=f"b/{filename}" if filename else "b",
-    )
-    return "".join(diff)
+    groups = _group_opcodes(_diff_opcodes(old_lines, new_lines))
+
+    out: list[str] = []
+    for group in groups:
+        if not out:
+            out.append(f"--- {f'a/{filename}' if filename else 'a'}\n")
+            out.append(f"+++ {f'b/{filename}' if filename else 'b'}\n")
+        first, last = group[0], group[-1]
+        out.append(
+            f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@\n"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in old_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                out.extend("-" + line for line in old_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                out.extend("+" + line for line in new_lines[j1:j2])
+    return "".join(out)
 
 
 def generate_diff_lines(old: str, new: str) -> list[DiffLine]:
-    old_lines = old.splitlines(keepends=True)
-    new_lines = new.splitlines(keepends=True)
-    diff = difflib.unified_diff(old_lines, new_lines, lineterm="")
+    """直接由 opcodes 生成 DiffLine（每个变更块保留 3 行上下文），无需拼接再解析 diff 文本。"""
+    old_lines = old.splitlines()
+    new_lines = new.splitlines()
     result: list[DiffLine] = []
 
-    for line in diff:
-        if line.startswith(("+++", "---", "@@")):
-            continue
-        if line.startswith("+"):
-            result.append(DiffLine(type="add", content=line[1:].rstrip("\n")))
-        elif line.startswith("-"):
-            result.append(DiffLine(type="remove", content=line[1:].rstrip("\n")))
-        else:
-            result.append(DiffLine(type="context", content=line.rstrip("\n")))
+    for group in _group_opcodes(_diff_opcodes(old_lines, new_lines)):
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                result.extend(DiffLine(type="context", content=line) for line in old_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                result.extend(DiffLine(type="remove", content=line) for line in old_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                result.extend(DiffLine(type="add", content=line) for line in new_lines[j1:j2])
     return result
 
 
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import os
+import stat
+import uuid
+from itertools import chain, islice
 from pathlib import Path
 from typing import Any
 
@@ -10,21 +14,62 @@ from minicc.tools.common import (
     DEFAULT_READ_LIMIT,
     find_whitespace_tolerant,
     generate_unified_diff,
+    load_fs,
     normalize_whitespace,
+    relative_to_cwd,
     resolve_path,
 )
 
 
+_READ_BUFFER_SIZE = 128 * 1024
+_MAX_LINE_CHARS = 2000
+
+
+def _read_line_window(path: Path, start: int, count: int) -> tuple[list[str], bool]:
+    """流式读取 [start, start+count) 行，不把整个文件读入内存；返回 (行, 是否还有更多)。
+
+    分行规则与 read_text().splitlines() 一致：通用换行模式处理 \r\n / \r，
+    每个物理行再 splitlines() 一次以拆开 \v、\f、\u2028 等分隔符。
+    """
+    with path.open("r", encoding="utf-8", newline=None, buffering=_READ_BUFFER_SIZE) as f:
+        it = islice(chain.from_iterable(line.splitlines() for line in f), start, None)
+        lines = list(islice(it, count))
+        has_more = next(it, None) is not None
+    return lines, has_more
+
+
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """先写同目录临时文件再 os.replace，避免中途失败留下半截文件；保留原文件权限。"""
+    target = Path(os.path.realpath(path))
+    # 临时文件名带随机后缀并以独占方式创建：并发写同一文件（如并行子代理）时互不覆盖
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    f = open(tmp, "xb", buffering=_WRITE_BUFFER_SIZE)
+    try:
+        with f:
+            f.write(content.encode("utf-8"))
+        try:
+            os.chmod(tmp, stat.S_IMODE(target.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 async def read_file(
     ctx: RunContext[MiniCCDeps],
     file_path: str,
     offset: int | None = None,
     limit: int | None = None,
 ) -> ToolResult:
-    fs = ctx.deps.fs
     resolved = resolve_path(ctx.deps.cwd, file_path)
 
     try:
+        fs = await load_fs(ctx.deps)
         if not resolved.exists():
             return ToolResult(success=False, output="", error=f"文件不存在: {file_path}")
         if resolved.is_dir():
@@ -34,29 +79,26 @@ async def read_file(
         count = limit or DEFAULT_READ_LIMIT
 
         if fs is not None:
-            rel_path = (
-                str(resolved.relative_to(ctx.deps.cwd))
-                if resolved.is_absolute()
-                else file_path
-            )
-            lines = fs.read_lines(rel_path, start_line=start_line, count=count)
+            rel_path = relative_to_cwd(ctx.deps.cwd, resolved) if resolved.is_absolute() else file_path
+            # 多取一行用于判断是否还有剩余内容
+            lines = fs.read_lines(rel_path, start_line=start_line, count=count + 1)
+            has_more = len(lines) > count
+            lines = lines[:count]
         else:
-            text = resolved.read_text(encoding="utf-8")
-            all_lines = text.splitlines()
-            lines = all_lines[start_line : start_line + count]
+            lines, has_more = _read_line_window(resolved, start_line, count)
 
         if not lines:
             return ToolResult(success=True, output="（文件为空或偏移超出范围）")
 
-        formatted: list[str] = []
-        for i, line in enumerate(lines, start=start_line + 1):
-            if len(line) > 2000:
-                line = line[:2000] + "..."
-            formatted.append(f"{i:6}\t{line}")
-
-        output = "\n".join(formatted)
-        if len(lines) >= count:
-            output += "\n\n... 可能还有更多行未显示"
+        # str.join 对生成器也会先转成列表，直接用列表推导一次构造
+        output = "\n".join(
+            [
+                f"{i:6}\t{line if len(line) <= _MAX_LINE_CHARS else line[:_MAX_LINE_CHARS] + '...'}"
+                for i, line in enumerate(lines, start=start_line + 1)
+            ]
+        )
+        if has_more:
+            output += "\n\n... 还有更多行未显示"
         return ToolResult(success=True, output=output)
 
     except UnicodeDecodeError:
@@ -70,23 +112,19 @@ async def write_file(
     file_path: str,
     content: str,
 ) -> ToolResult:
-    fs = ctx.deps.fs
     resolved = resolve_path(ctx.deps.cwd, file_path)
 
     try:
+        fs = await load_fs(ctx.deps)
         resolved.parent.mkdir(parents=True, exist_ok=True)
 
         if fs is not None:
-            rel_path = (
-                str(resolved.relative_to(ctx.deps.cwd))
-                if resolved.is_absolute()
-                else file_path
-            )
+            rel_path = relative_to_cwd(ctx.deps.cwd, resolved) if resolved.is_absolute() else file_path
             ok = fs.write_file(rel_path, content)
             if not ok:
                 return ToolResult(success=False, output="", error="写入失败")
         else:
-            resolved.write_text(content, encoding="utf-8")
+            _atomic_write(resolved, content)
 
         return ToolResult(success=True, output=f"已写入文件: {file_path} ({len(content)} 字符)")
     except Exception as e:
@@ -100,40 +138,43 @@ async def edit_file(
     new_string: str,
     replace_all: bool = False,
 ) -> ToolResult:
-    fs = ctx.deps.fs
+    # 参数本身无效时不必触碰文件系统
+    if not old_string:
+        return ToolResult(success=False, output="", error="old_string 不能为空")
+    if old_string == new_string:
+        return ToolResult(success=False, output="", error="new_string 必须与 old_string 不同")
+
     resolved = resolve_path(ctx.deps.cwd, file_path)
 
     try:
+        fs = await load_fs(ctx.deps)
         if not resolved.exists():
             return ToolResult(success=False, output="", error=f"文件不存在: {file_path}")
         if resolved.is_dir():
             return ToolResult(success=False, output="", error=f"不是文件: {file_path}")
-        if old_string == new_string:
-            return ToolResult(success=False, output="", error="new_string 必须与 old_string 不同")
 
         if fs is not None:
-            rel_path = (
-                str(resolved.relative_to(ctx.deps.cwd))
-                if resolved.is_absolute()
-                else file_path
-            )
+            rel_path = relative_to_cwd(ctx.deps.cwd, resolved) if resolved.is_absolute() else file_path
             current = fs.read_file(rel_path)
         else:
             current = resolved.read_text(encoding="utf-8")
 
-        exact_count = current.count(old_string)
+        # split 一次同时得到出现次数和替换所需的片段
+        parts = current.split(old_string)
+        exact_count = len(parts) - 1
         actual_old = old_string
 
         if exact_count == 0:
             normalized_old = normalize_whitespace(old_string)
             match = find_whitespace_tolerant(current, normalized_old)
-            if match is None:
+            if not match:
                 return ToolResult(
                     success=False,
                     output="",
                     error="未找到要替换的内容，请确保 old_string 精确匹配文件内容",
                 )
             actual_old = match
+            parts = current.split(actual_old)
             exact_count = 1
 
         if exact_count > 1 and not replace_all:
@@ -144,21 +185,16 @@ async def edit_file(
             )
 
         if replace_all:
-            updated = current.replace(actual_old, new_string)
+            updated = new_string.join(parts)
         else:
-            updated = current.replace(actual_old, new_string, 1)
+            updated = parts[0] + new_string + actual_old.join(parts[1:])
 
         if fs is not None:
-            rel_path = (
-                str(resolved.relative_to(ctx.deps.cwd))
-                if resolved.is_absolute()
-                else file_path
-            )
             ok = fs.write_file(rel_path, updated)
             if not ok:
                 return ToolResult(success=False, output="", error="写入失败")
         else:
-            resolved.write_text(updated, encoding="utf-8")
+            _atomic_write(resolved, updated)
 
         diff = generate_unified_diff(current, updated, filename=str(resolved))
         return ToolResult(success=True, output=diff or "OK")
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import re
 from collections import Counter
 from json import JSONDecodeError
@@ -8,6 +7,7 @@ from json import JSONDecodeError
 from pydantic_ai import RunContext
 from pydantic import TypeAdapter, ValidationError
 
+from minicc.core import jsonio
 from minicc.core.models import MiniCCDeps, Question, QuestionOption, ToolResult
 
 
@@ -64,7 +64,7 @@ def _validate_and_normalize_ask_user_questions(payload: object) -> list[Question
     data: object = payload
     if isinstance(data, str):
         try:
-            data = json.loads(data)
+            data = jsonio.loads(data)
         except JSONDecodeError as e:
             raise ValueError(
                 "ask_user 参数错误：`questions` 必须是 JSON 数组（list），每项包含 `header`、`question`、`options`。"
@@ -120,4 +120,4 @@ async def ask_user(ctx: RunContext[MiniCCDeps], questions: list[Question]) -> To
         )
 
     result = await service.ask(parsed_questions)
-    return ToolResult(success=True, output=json.dumps(result.answers, ensure_ascii=False))
+    return ToolResult(success=True, output=jsonio.dumps(result.answers))
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from pydantic_ai import Agent
+import copy
+from functools import cache
+
+from pydantic_ai import Tool
 
 from minicc.core.models import MiniCCDeps
 from minicc.tools.file import edit_file, read_file, write_file
@@ -9,24 +12,34 @@ from minicc.tools.search import glob_files, grep_search
 from minicc.tools.shell import bash, bash_output, kill_shell
 from minicc.tools.task import task, todo_write, wait_subagents
 
-
-def register_tools(agent: Agent[MiniCCDeps, str]) -> None:
+# 工具注册表（顺序即注册顺序，保持稳定以便 prompt cache 命中）
+TOOL_FUNCTIONS = (
     # 文件操作
-    agent.tool(read_file)
-    agent.tool(write_file)
-    agent.tool(edit_file)
-
+    read_file,
+    write_file,
+    edit_file,
     # 搜索
-    agent.tool(glob_files)
-    agent.tool(grep_search)
-
+    glob_files,
+    grep_search,
     # 命令行
-    agent.tool(bash)
-    agent.tool(bash_output)
-    agent.tool(kill_shell)
-
+    bash,
+    bash_output,
+    kill_shell,
     # 任务与交互
-    agent.tool(task)
-    agent.tool(todo_write)
-    agent.tool(wait_subagents)
-    agent.tool(ask_user)
+    task,
+    todo_write,
+    wait_subagents,
+    ask_user,
+)
+
+
+@cache
+def _tool_definitions() -> tuple[Tool[MiniCCDeps], ...]:
+    """按注册表构建 Tool；签名解析与 JSON schema 生成每个进程只做一次"""
+    return tuple(Tool(func, takes_ctx=True) for func in TOOL_FUNCTIONS)
+
+
+def build_tools() -> list[Tool[MiniCCDeps]]:
+    """返回供 Agent(tools=...) 使用的工具列表"""
+    # 注册时 toolset 会回写 max_retries/metadata，因此每个 Agent 使用浅拷贝（共享已生成的 schema）
+    return [copy.copy(tool) for tool in _tool_definitions()]
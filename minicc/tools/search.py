@@ -1,14 +1,82 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import os
 import re
+import shutil
+from collections import deque
+from collections.abc import Iterator
+from itertools import islice
 from pathlib import Path
 from typing import Literal
 
 from pydantic_ai import RunContext
 
+from minicc.core import jsonio
 from minicc.core.models import MiniCCDeps, ToolResult
-from minicc.tools.common import MAX_OUTPUT_CHARS, resolve_path
+from minicc.tools.common import MAX_OUTPUT_CHARS, compile_regex, load_fs, resolve_path
+
+
+# fallback 遍历时不进入的目录（模式中显式写出目录名时除外）
+_IGNORED_DIRS = frozenset(
+    {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox"}
+)
+
+
+def _glob_fallback(base: str, pattern: str) -> list[str]:
+    """基于 os.scandir 的 glob：DirEntry 自带类型信息，无需逐个 stat。
+
+    从模式的字面前缀目录开始遍历；不含 ** 时按模式层数限制深度；
+    模式中没有以 . 开头的片段时不进入隐藏目录（通配符本就不匹配它们）；
+    _IGNORED_DIRS 中的目录在下降前就剪掉。
+    """
+    from wcmatch import glob as wcglob
+
+    flags = wcglob.GLOBSTAR | wcglob.BRACE | wcglob.EXTGLOB
+    if os.path.isabs(pattern):
+        return [os.path.relpath(m, start=base) for m in wcglob.glob(pattern, flags=flags)]
+
+    # 以 / 结尾的模式只匹配目录，wcmatch 对目录的匹配结果带结尾的 /
+    dir_only = pattern.endswith("/")
+    parts = pattern.rstrip("/").split("/")
+    prefix: list[str] = []
+    while len(parts) > 1 and parts[0] and not wcglob.is_magic(parts[0], flags=flags):
+        prefix.append(parts.pop(0))
+    max_depth = None if "**" in pattern or "{" in pattern else len(parts)
+    walk_hidden = "/." in f"/{pattern}"
+    # 按路径片段判断模式是否显式写出了被忽略的目录（子串判断会把 .github 误当作 .git）
+    named_dirs = frozenset(pattern.split("/"))
+
+    root = os.path.join(base, *prefix)
+    matches: list[str] = []
+    if prefix and os.path.isdir(root) and wcglob.globmatch(f"{'/'.join(prefix)}/", pattern, flags=flags):
+        matches.append(f"{'/'.join(prefix)}/")
+    stack: list[tuple[str, str, int]] = [(root, "/".join(prefix), 0)]
+    while stack:
+        dir_path, rel_dir, depth = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs: list[tuple[str, str, int]] = []
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if dir_only:
+                if entry.is_dir() and wcglob.globmatch(f"{rel}/", pattern, flags=flags):
+                    matches.append(f"{rel}/")
+            elif wcglob.globmatch(rel, pattern, flags=flags):
+                matches.append(rel)
+            if (
+                (max_depth is None or depth + 1 < max_depth)
+                and (walk_hidden or not entry.name.startswith("."))
+                and (entry.name not in _IGNORED_DIRS or entry.name in named_dirs)
+                and entry.is_dir(follow_symlinks=False)
+            ):
+                subdirs.append((entry.path, rel, depth + 1))
+        stack.extend(reversed(subdirs))
+    return matches
 
 
 async def glob_files(
@@ -20,8 +88,8 @@ async def glob_files(
     if not base.exists():
         return ToolResult(success=False, output="", error=f"路径不存在: {path or '.'}")
 
-    fs = ctx.deps.fs
     try:
+        fs = await load_fs(ctx.deps)
         if fs is not None:
             full_pattern = f"{path}/{pattern}" if path else pattern
             matches = fs.glob(full_pattern)
@@ -29,18 +97,84 @@ async def glob_files(
                 return ToolResult(success=True, output=f"未找到匹配 '{pattern}' 的文件")
             return ToolResult(success=True, output="\n".join(matches))
 
-        from wcmatch import glob as wcglob
-
-        flags = wcglob.GLOBSTAR | wcglob.BRACE | wcglob.EXTGLOB
-        matches = wcglob.glob(pattern, root_dir=str(base), flags=flags)
+        matches = await asyncio.to_thread(_glob_fallback, str(base), pattern)
         if not matches:
             return ToolResult(success=True, output=f"未找到匹配 '{pattern}' 的文件")
-        rels = [os.path.relpath(m, start=str(base)) for m in matches]
-        return ToolResult(success=True, output="\n".join(rels))
+        return ToolResult(success=True, output="\n".join(matches))
     except Exception as e:
         return ToolResult(success=False, output="", error=str(e))
 
 
+# rg --json 单行可能很长（长行匹配），放宽 StreamReader 的行长度上限
+_RG_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def _rg_text(obj: dict) -> str:
+    if "text" in obj:
+        return obj["text"]
+    return base64.b64decode(obj.get("bytes", "")).decode("utf-8", errors="replace")
+
+
+def _format_rg_event(raw: bytes) -> str | None:
+    """把 rg --json 的 match/context 事件格式化为 path:line:text（上下文行用 -）。"""
+    event = jsonio.loads(raw)
+    kind = event.get("type")
+    if kind not in ("match", "context"):
+        return None
+    data = event["data"]
+    sep = ":" if kind == "match" else "-"
+    text = _rg_text(data["lines"]).rstrip("\r\n")
+    return f"{_rg_text(data['path'])}{sep}{data['line_number']}{sep}{text}"
+
+
+async def _run_rg(argv: list[str], json_mode: bool, head_limit: int | None) -> tuple[list[str], bool, str | None]:
+    """运行 rg 并逐行读取输出；达到 head_limit 后立即终止进程。返回 (行, 是否还有更多, 错误)。"""
+    proc = await asyncio.create_subprocess_exec(
+        *argv,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=_RG_LINE_LIMIT,
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr_task = asyncio.create_task(proc.stderr.read())
+    lines: list[str] = []
+    has_more = False
+    eof = False
+    try:
+        async for raw in proc.stdout:
+            if json_mode:
+                try:
+                    line = _format_rg_event(raw)
+                except (ValueError, KeyError, TypeError):
+                    continue  # 单个事件解析失败时跳过，不中断整个输出流
+            else:
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if line is None:
+                continue
+            if head_limit and len(lines) >= head_limit:
+                has_more = True
+                break
+            lines.append(line)
+        else:
+            eof = True
+    except BaseException:
+        # 取消、超长行等提前退出：stdout 不再被读取，必须终止 rg，否则它会阻塞在写满的管道上
+        stderr_task.cancel()
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+        raise
+    if not eof and proc.returncode is None:
+        proc.kill()
+    returncode = await proc.wait()
+    stderr = await stderr_task
+
+    # rg 退出码：0 有匹配，1 无匹配，2 出错（部分文件出错时也可能有结果）
+    if returncode == 2 and not lines:
+        return [], False, stderr.decode("utf-8", errors="replace").strip() or "rg 执行失败"
+    return lines, has_more, None
+
+
 async def grep_search(
     ctx: RunContext[MiniCCDeps],
     pattern: str,
@@ -58,48 +192,8 @@ async def grep_search(
     if not search_path.exists():
         return ToolResult(success=False, output="", error=f"路径不存在: {path or '.'}")
 
-    try:
-        from ripgrepy import Ripgrepy
-
-        rg = Ripgrepy(pattern, str(search_path))
-        if case_insensitive:
-            rg = rg.i()
-        if glob:
-            rg = rg.glob(glob)
-        if file_type:
-            rg = rg.type(file_type)
-        if context:
-            rg = rg.context(context)
-        else:
-            if context_before:
-                rg = rg.before_context(context_before)
-            if context_after:
-                rg = rg.after_context(context_after)
-
-        if output_mode == "files_with_matches":
-            rg = rg.files_with_matches()
-        elif output_mode == "count":
-            rg = rg.count()
-        else:
-            rg = rg.with_filename().line_number()
-
-        result = rg.run()
-        output = result.as_string if hasattr(result, "as_string") else str(result)
-        if not output.strip():
-            return ToolResult(success=True, output=f"未找到匹配 '{pattern}' 的内容")
-
-        lines = output.strip().split("\n")
-        if head_limit and len(lines) > head_limit:
-            lines = lines[:head_limit]
-            output = "\n".join(lines) + "\n... 还有更多结果"
-        else:
-            output = "\n".join(lines)
-
-        if len(output) > MAX_OUTPUT_CHARS:
-            output = output[:MAX_OUTPUT_CHARS] + "\n... 输出已截断"
-        return ToolResult(success=True, output=output)
-
-    except ImportError:
+    rg = shutil.which("rg")
+    if rg is None:
         return await _grep_fallback(
             ctx,
             pattern=pattern,
@@ -109,10 +203,79 @@ async def grep_search(
             case_insensitive=case_insensitive,
             head_limit=head_limit,
         )
+
+    argv = [rg, "--no-messages"]
+    if output_mode == "content":
+        argv.append("--json")
+    elif output_mode == "files_with_matches":
+        argv.append("--files-with-matches")
+    elif output_mode == "count":
+        argv.extend(["--count", "--with-filename"])
+    if case_insensitive:
+        argv.append("-i")
+    if glob:
+        argv.extend(["-g", glob])
+    if file_type:
+        argv.extend(["-t", file_type])
+    if context:
+        argv.extend(["-C", str(context)])
+    else:
+        if context_before:
+            argv.extend(["-B", str(context_before)])
+        if context_after:
+            argv.extend(["-A", str(context_after)])
+    argv.extend(["-e", pattern, "--", str(search_path)])
+
+    try:
+        lines, has_more, error = await _run_rg(argv, output_mode == "content", head_limit)
+        if error:
+            return ToolResult(success=False, output="", error=error)
+        if not lines:
+            return ToolResult(success=True, output=f"未找到匹配 '{pattern}' 的内容")
+
+        output = "\n".join(lines)
+        if has_more:
+            output += "\n... 还有更多结果"
+        if len(output) > MAX_OUTPUT_CHARS:
+            output = output[:MAX_OUTPUT_CHARS] + "\n... 输出已截断"
+        return ToolResult(success=True, output=output)
+
     except Exception as e:
         return ToolResult(success=False, output="", error=str(e))
 
 
+# 回退 grep 时并发读取文件的上限（线程池中执行）
+_GREP_CONCURRENCY = 32
+
+
+def _iter_grep_files(search_path: Path, glob: str | None) -> Iterator[Path]:
+    if search_path.is_file():
+        yield search_path
+        return
+    for root, dirnames, filenames in os.walk(search_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in _IGNORED_DIRS)
+        for name in sorted(filenames):
+            p = Path(root, name)
+            if not (glob and not p.match(glob)):
+                yield p
+
+
+def _scan_one(path: Path, regex: re.Pattern[str], want_lines: bool) -> tuple[int, list[str]]:
+    """在工作线程中扫描单个文件，返回 (命中行数, content 模式下的匹配行)。"""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except Exception:
+        return 0, []
+    hits = 0
+    lines: list[str] = []
+    for i, line in enumerate(text.splitlines(), start=1):
+        if regex.search(line):
+            hits += 1
+            if want_lines:
+                lines.append(f"{path}:{i}:{line}")
+    return hits, lines
+
+
 async def _grep_fallback(
     ctx: RunContext[MiniCCDeps],
     *,
@@ -125,47 +288,52 @@ async def _grep_fallback(
 ) -> ToolResult:
     flags = re.IGNORECASE if case_insensitive else 0
     try:
-        regex = re.compile(pattern, flags=flags)
+        regex = compile_regex(pattern, flags)
     except re.error as e:
         return ToolResult(success=False, output="", error=f"无效正则: {e}")
 
-    matched_files: list[str] = []
-    matched_lines: list[str] = []
-    file_counts: dict[str, int] = {}
+    files = _iter_grep_files(search_path, glob)
+    want_lines = output_mode == "content"
+    # 多取一条结果，用于判断是否还有更多
+    wanted = head_limit + 1 if head_limit else None
 
-    for p in search_path.rglob("*"):
-        if not p.is_file():
-            continue
-        if glob and not p.match(glob):
-            continue
-        try:
-            text = p.read_text(encoding="utf-8")
-        except Exception:
-            continue
-        hits = 0
-        for i, line in enumerate(text.splitlines(), start=1):
-            if regex.search(line):
-                hits += 1
-                if output_mode == "content":
-                    matched_lines.append(f"{p}:{i}:{line}")
-        if hits:
-            matched_files.append(str(p))
-            file_counts[str(p)] = hits
-
-    if output_mode == "files_with_matches":
-        output = "\n".join(matched_files)
-    elif output_mode == "count":
-        output = "\n".join(f"{f}:{c}" for f, c in file_counts.items())
-    else:
-        output = "\n".join(matched_lines)
+    # 按遍历顺序排队的扫描任务；最多 _GREP_CONCURRENCY 个在途，凑够结果后不再遍历/扫描剩余文件
+    pending: deque[tuple[Path, asyncio.Task[tuple[int, list[str]]]]] = deque()
+    exhausted = False
+    results: list[str] = []
+    try:
+        while wanted is None or len(results) < wanted:
+            if not exhausted and len(pending) <= _GREP_CONCURRENCY // 2:
+                # 目录遍历同样在线程中进行，每次补充一批
+                size = _GREP_CONCURRENCY - len(pending)
+                batch = await asyncio.to_thread(list, islice(files, size))
+                exhausted = len(batch) < size
+                for file_path in batch:
+                    scan = asyncio.create_task(asyncio.to_thread(_scan_one, file_path, regex, want_lines))
+                    pending.append((file_path, scan))
+            if not pending:
+                break
+            file_path, scan = pending.popleft()
+            hits, lines = await scan
+            if not hits:
+                continue
+            if output_mode == "files_with_matches":
+                results.append(str(file_path))
+            elif output_mode == "count":
+                results.append(f"{file_path}:{hits}")
+            else:
+                results.extend(lines)
+    finally:
+        for _, scan in pending:
+            scan.cancel()
 
-    if not output.strip():
+    if not results:
         return ToolResult(success=True, output=f"未找到匹配 '{pattern}' 的内容")
 
-    if head_limit:
-        lines = output.split("\n")
-        if len(lines) > head_limit:
-            output = "\n".join(lines[:head_limit]) + "\n... 还有更多结果"
+    if head_limit and len(results) > head_limit:
+        output = "\n".join(results[:head_limit]) + "\n... 还有更多结果"
+    else:
+        output = "\n".join(results)
 
     if len(output) > MAX_OUTPUT_CHARS:
         output = output[:MAX_OUTPUT_CHARS] + "\n... 输出已截断"
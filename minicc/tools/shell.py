@@ -3,13 +3,23 @@ from __future__ import annotations
 import asyncio
 import os
 import re
+import shlex
 import signal
+from dataclasses import dataclass, field
 from uuid import uuid4
 
 from pydantic_ai import RunContext
 
 from minicc.core.models import BackgroundShell, MiniCCDeps, ToolResult
-from minicc.tools.common import DEFAULT_BASH_TIMEOUT_MS, MAX_OUTPUT_CHARS
+from minicc.tools.common import DEFAULT_BASH_TIMEOUT_MS, MAX_OUTPUT_CHARS, compile_regex
+
+_READ_CHUNK_SIZE = 65536
+# 捕获输出的字节上限：UTF-8 每个字符至多 4 字节，解码后再按 MAX_OUTPUT_CHARS 个字符截断
+_CAPTURE_BYTES = 4 * MAX_OUTPUT_CHARS
+# 前台 bash 复用的常驻 shell 数量
+_POOL_SIZE = 2
+# 命令含单独的 &（后台任务）时不走常驻 shell：后台进程会继续持有管道，输出串到后续命令
+_BACKGROUND_AMP = re.compile(r"(?<![&>|])&(?![&>])")
 
 
 async def bash(
@@ -39,18 +49,18 @@ async def bash(
         return await _bash_background(ctx, command, description or command[:30])
 
     try:
-        process = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=ctx.deps.cwd,
-            preexec_fn=os.setsid if os.name == "posix" else None,
-        )
-
         try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout_sec)
+            if os.name == "posix" and not _BACKGROUND_AMP.search(command):
+                if ctx.deps.shell_pool is None:
+                    ctx.deps.shell_pool = ShellPool()
+                stdout, out_cut, stderr, err_cut, returncode = await ctx.deps.shell_pool.run(
+                    command, cwd=ctx.deps.cwd, timeout=timeout_sec, cap=_CAPTURE_BYTES
+                )
+            else:
+                stdout, out_cut, stderr, err_cut, returncode = await _run_spawned(
+                    command, cwd=ctx.deps.cwd, timeout=timeout_sec, cap=_CAPTURE_BYTES
+                )
         except asyncio.TimeoutError:
-            _kill_process_tree(process)
             if ctx.deps.logger is not None:
                 ctx.deps.logger.print(f"Invoke bash tool timeout, timeout={timeout}.")
             return ToolResult(success=False, output="", error=f"命令执行超时（{timeout_sec:.1f}秒）")
@@ -61,11 +71,11 @@ async def bash(
         if stderr_str:
             output = f"{output}\n[stderr]\n{stderr_str}" if output else stderr_str
 
-        if len(output) > MAX_OUTPUT_CHARS:
+        if out_cut or err_cut or len(output) > MAX_OUTPUT_CHARS:
             output = output[:MAX_OUTPUT_CHARS] + "\n... 输出已截断"
 
-        success = process.returncode == 0
-        error = None if success else f"退出码: {process.returncode}"
+        success = returncode == 0
+        error = None if success else f"退出码: {returncode}"
         if ctx.deps.logger is not None:
             ctx.deps.logger.print(f"Invoke bash tool success with output: {output}")
         return ToolResult(success=success, output=output, error=error)
@@ -76,6 +86,158 @@ async def bash(
         return ToolResult(success=False, output="", error=str(e))
 
 
+async def _run_spawned(command: str, *, cwd: str, timeout: float, cap: int) -> tuple[bytes, bool, bytes, bool, int]:
+    """为命令单独启动一个 shell；超时时杀掉整个进程组并抛出 asyncio.TimeoutError。"""
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,  # 与常驻 shell 路径一致
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        preexec_fn=os.setsid if os.name == "posix" else None,
+    )
+    try:
+        (stdout, out_cut), (stderr, err_cut), returncode = await asyncio.wait_for(
+            asyncio.gather(_drain(process.stdout, cap), _drain(process.stderr, cap), process.wait()),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        await _reap(process)
+        raise
+    return stdout, out_cut, stderr, err_cut, returncode
+
+
+@dataclass
+class ShellPool:
+    """常驻 /bin/sh 池：前台命令经 stdin 投递给空闲 shell，省去每次 fork+exec 新 shell 的开销。
+
+    每条命令在子 shell `( eval ... )` 中执行，cd/export/exit 不会污染常驻 shell；
+    命令的 stdin 指向 /dev/null，stdout/stderr 以一次性随机 token 作为结束标记。
+    超时、取消或 shell 异常退出时杀掉该 shell 的进程组，不再放回池中；
+    结束标记之后还有多余数据（脱离的子进程仍在写管道）时同样丢弃该 shell。
+    """
+
+    size: int = _POOL_SIZE
+    _idle: list[asyncio.subprocess.Process] = field(default_factory=list)
+
+    async def run(self, command: str, *, cwd: str, timeout: float, cap: int) -> tuple[bytes, bool, bytes, bool, int]:
+        process = await self._acquire()
+        token = f"__MINICC_DONE_{uuid4().hex}__"
+        script = (
+            f"cd -- {shlex.quote(cwd)} && ( eval {shlex.quote(command)} ) </dev/null; "
+            f"printf '%s%d\\n' {token} $?; printf '%s' {token} >&2\n"
+        )
+        try:
+            assert process.stdin is not None
+            process.stdin.write(script.encode("utf-8"))
+            await process.stdin.drain()
+            (stdout, out_cut, rest), (stderr, err_cut, err_rest) = await asyncio.wait_for(
+                asyncio.gather(
+                    _read_until(process.stdout, token.encode(), cap, trailer=True),
+                    _read_until(process.stderr, token.encode(), cap),
+                ),
+                timeout=timeout,
+            )
+        except BaseException:
+            await _reap(process)
+            raise
+        status, _, extra = rest.partition(b"\n")
+        if extra or err_rest:
+            await _reap(process)
+        else:
+            await self._release(process)
+        return stdout, out_cut, stderr, err_cut, int(status)
+
+    async def _acquire(self) -> asyncio.subprocess.Process:
+        while self._idle:
+            process = self._idle.pop()
+            if process.returncode is None:
+                return process
+        return await asyncio.create_subprocess_exec(
+            "/bin/sh",
+            "-s",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            preexec_fn=os.setsid,
+        )
+
+    async def _release(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is None and len(self._idle) < self.size:
+            self._idle.append(process)
+        else:
+            await _reap(process)
+
+    def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for process in idle:
+            _kill_process_tree(process)
+
+    async def aclose(self) -> None:
+        """杀掉空闲 shell 并等待回收（事件循环结束前调用可避免子进程 transport 泄漏告警）。"""
+        idle = list(self._idle)
+        self.close()
+        await asyncio.gather(*(process.wait() for process in idle))
+
+
+async def _read_until(
+    stream: asyncio.StreamReader | None, token: bytes, cap: int, *, trailer: bool = False
+) -> tuple[bytes, bool, bytes]:
+    """读到 token 为止，只保留前 cap 字节；trailer=True 时再读完 token 后的一行（退出码）。
+
+    返回 (内容, 是否截断, token 之后的数据)。流提前结束说明常驻 shell 已退出。
+    """
+    if stream is None:
+        raise ConnectionResetError("常驻 shell 没有输出管道")
+    kept = bytearray()
+    truncated = False
+    pending = bytearray()
+
+    def keep(data: bytes | bytearray) -> None:
+        nonlocal truncated
+        room = cap - len(kept)
+        if room > 0:
+            kept.extend(data[:room])
+        if len(data) > room:
+            truncated = True
+
+    while True:
+        chunk = await stream.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            raise ConnectionResetError("常驻 shell 意外退出")
+        pending.extend(chunk)
+        idx = pending.find(token)
+        if idx >= 0:
+            keep(pending[:idx])
+            rest = bytes(pending[idx + len(token) :])
+            while trailer and b"\n" not in rest:
+                chunk = await stream.read(_READ_CHUNK_SIZE)
+                if not chunk:
+                    raise ConnectionResetError("常驻 shell 意外退出")
+                rest += chunk
+            return bytes(kept), truncated, rest
+        # 末尾可能是 token 的前半段，留到下一轮再判断
+        safe = len(pending) - (len(token) - 1)
+        if safe > 0:
+            keep(pending[:safe])
+            del pending[:safe]
+
+
+async def _drain(stream: asyncio.StreamReader | None, cap: int) -> tuple[bytes, bool]:
+    """读完整个流（避免子进程写满管道阻塞），只保留前 cap 字节；返回 (内容, 是否截断)。"""
+    buf = bytearray()
+    truncated = False
+    if stream is None:
+        return b"", False
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        room = cap - len(buf)
+        if room > 0:
+            buf.extend(chunk[:room])
+        if len(chunk) > room:
+            truncated = True
+    return bytes(buf), truncated
+
+
 async def bash_output(
     ctx: RunContext[MiniCCDeps],
     bash_id: str,
@@ -92,7 +254,7 @@ async def bash_output(
     output = shell_info.output_buffer
     if filter_pattern and output:
         try:
-            regex = re.compile(filter_pattern)
+            regex = compile_regex(filter_pattern)
             output = "\n".join(line for line in output.split("\n") if regex.search(line))
         except re.error:
             pass
@@ -118,6 +280,12 @@ async def kill_shell(ctx: RunContext[MiniCCDeps], shell_id: str) -> ToolResult:
     return ToolResult(success=True, output=f"已终止后台任务: {shell_id}")
 
 
+async def _reap(process: asyncio.subprocess.Process) -> None:
+    """杀掉进程组并等待回收，避免留下僵尸进程。"""
+    _kill_process_tree(process)
+    await process.wait()
+
+
 def _kill_process_tree(process: asyncio.subprocess.Process) -> None:
     if os.name == "posix" and process.pid:
         try:
@@ -151,10 +319,10 @@ async def _collect_shell_output(process: asyncio.subprocess.Process, shell_info:
         while True:
             if process.stdout is None:
                 break
-            line = await process.stdout.readline()
-            if not line:
+            chunk = await process.stdout.read(_READ_CHUNK_SIZE)
+            if not chunk:
                 break
-            shell_info.output_buffer += line.decode("utf-8", errors="replace")
+            shell_info.append_output(chunk)
     except Exception:
         pass
     finally:
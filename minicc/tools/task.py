@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-import json
 
 from pydantic_ai import RunContext
 
+from minicc.core import jsonio
 from minicc.core.events import TodoUpdated
-from minicc.core.models import MiniCCDeps, TodoItem, ToolResult
+from minicc.core.models import AgentTask, MiniCCDeps, TodoItem, ToolResult
+
+_STATUS_ICON = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
 
 
 async def task(
@@ -48,23 +50,41 @@ async def wait_subagents(ctx: RunContext[MiniCCDeps]) -> ToolResult:
 
     适用于曾用 task(wait=False) 启动了多个子任务的场景。
     """
-    tasks = list(ctx.deps.sub_agent_tasks.values())
-    if not tasks:
+    task_map = {handle: task_id for task_id, handle in ctx.deps.sub_agent_tasks.items()}
+    if not task_map:
         return ToolResult(success=True, output="当前没有运行中的子任务")
 
-    await asyncio.gather(*tasks, return_exceptions=True)
+    # 按完成顺序汇总：先结束的子任务立即写入结果（并记录日志），不必等最慢的那个
+    blocks: list[str] = []
+    reported: set[str] = set()
+    async for done in asyncio.as_completed(task_map):
+        if not done.cancelled():
+            done.exception()  # 与 gather(return_exceptions=True) 一致：吞掉异常，状态以 AgentTask 为准
+        task_id = task_map[done]
+        t = ctx.deps.sub_agents.get(task_id)
+        if t is None or t.status not in ("completed", "failed"):
+            continue
+        reported.add(task_id)
+        blocks.append(_summary_block(task_id, t))
+        if ctx.deps.logger is not None:
+            ctx.deps.logger.print(f"Subagent [{task_id}] finished: {t.status}")
+
+    # 之前已结束的子任务也一并汇总（全部子任务都已在上面写入时跳过遍历）
+    if len(reported) < len(ctx.deps.sub_agents):
+        for task_id, t in ctx.deps.sub_agents.items():
+            if task_id not in reported and t.status in ("completed", "failed"):
+                blocks.append(_summary_block(task_id, t))
+
+    # 每个子任务一段，段间空一行
+    output = "\n\n".join(blocks) or "子任务已结束（无可用结果）"
+    return ToolResult(success=True, output=output)
 
-    lines: list[str] = []
-    for task_id, t in ctx.deps.sub_agents.items():
-        if t.status in ("completed", "failed"):
-            head = f"[{task_id}] {t.description or ''}".strip()
-            lines.append(f"{head} ({t.status})")
-            if t.result:
-                lines.append(t.result)
-                lines.append("")
 
-    output = "\n".join(lines).rstrip() or "子任务已结束（无可用结果）"
-    return ToolResult(success=True, output=output)
+def _summary_block(task_id: str, t: AgentTask) -> str:
+    head = f"[{task_id}] {t.description or ''}".strip()
+    if t.result:
+        return f"{head} ({t.status})\n{t.result}"
+    return f"{head} ({t.status})"
 
 
 async def todo_write(ctx: RunContext[MiniCCDeps], todos: list[dict[str, str]]) -> ToolResult:
@@ -80,28 +100,37 @@ async def todo_write(ctx: RunContext[MiniCCDeps], todos: list[dict[str, str]]) -
                 {"content":"Task 4","status":"pending"}
             ]
     """
-    if ctx.deps.logger is not None:
-        ctx.deps.logger.print("Invoke todo_write tool with: {}".format(json.dumps(todos, indent=2, ensure_ascii=False)))
     try:
-        new_todos: list[TodoItem] = []
-        for item in todos:
-            new_todos.append(
-                TodoItem(
-                    content=item.get("content", ""),
-                    status=item.get("status", "pending"),
-                    active_form=item.get("activeForm", item.get("active_form", "")),
-                )
-            )
+        fields = [
+            (item.get("content", ""), item.get("status", "pending"), item.get("activeForm", item.get("active_form", "")))
+            for item in todos
+        ]
+        # 与当前列表完全相同（模型重复提交）时直接返回：不重建对象、不派发事件、不触发 UI 刷新
+        if fields == [(t.content, t.status, t.active_form) for t in ctx.deps.todos]:
+            if ctx.deps.logger is not None:
+                ctx.deps.logger.print(f"Invoke todo_write tool: unchanged ({len(fields)} todos)")
+            return ToolResult(success=True, output=f"任务列表无变化（共 {len(fields)} 个任务）")
+
+        new_todos = [
+            TodoItem(content=content, status=status, active_form=active_form) for content, status, active_form in fields
+        ]
 
         ctx.deps.todos = new_todos
+        # 先通知 UI，再做日志序列化（emit 与 logger.print 都不阻塞，无需放到线程里）
         if ctx.deps.event_bus is not None:
             ctx.deps.event_bus.emit(TodoUpdated(todos=new_todos))
+        _log_todos(ctx, todos)
 
-        summary_lines = []
-        for todo in new_todos:
-            status_icon = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}.get(todo.status, "?")
-            summary_lines.append(f"{status_icon} {todo.content}")
-
-        return ToolResult(success=True, output=f"已更新 {len(new_todos)} 个任务\n" + "\n".join(summary_lines))
+        icon = _STATUS_ICON.get
+        output = "\n".join(
+            [f"已更新 {len(new_todos)} 个任务", *(f"{icon(t.status, '?')} {t.content}" for t in new_todos)]
+        )
+        return ToolResult(success=True, output=output)
     except Exception as e:
+        _log_todos(ctx, todos)
         return ToolResult(success=False, output="", error=str(e))
+
+
+def _log_todos(ctx: RunContext[MiniCCDeps], todos: list[dict[str, str]]) -> None:
+    if ctx.deps.logger is not None:
+        ctx.deps.logger.print("Invoke todo_write tool with: {}".format(jsonio.dumps(todos, indent=True)))
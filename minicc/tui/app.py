@@ -9,17 +9,21 @@ MiniCC TUI 应用（多行输入 + @ 引用文件）
 
 from __future__ import annotations
 
-import json
+import asyncio
 import os
 import re
 import subprocess
 import traceback
-from typing import Any
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable
+from weakref import WeakSet
 
 from textual import work
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, Horizontal, VerticalScroll
+from textual.widget import Widget
 from textual.widgets import Footer, Header
 
 from pydantic_ai import AgentRunResultEvent
@@ -36,6 +40,7 @@ from pydantic_ai.messages import (
     ToolReturnPart,
 )
 
+from minicc.core import jsonio
 from minicc.core.config import load_config
 from minicc.core.events import (
     AskUserRequested,
@@ -46,12 +51,21 @@ from minicc.core.events import (
     ToolCallStarted,
 )
 from minicc.core.models import ToolResult, UserCancelledError
-from minicc.core.runtime import MiniCCRuntime, build_runtime
+from minicc.core.runtime import LazyFileSystem, MiniCCRuntime, build_runtime
 from minicc.tui.ask_user_panel import AskUserPanel
 from minicc.tui.chat_input import ChatInput
 from minicc.tui.file_mention_panel import FileMentionPanel
 from minicc.tui.widgets import BottomBar, MessagePanel, SubAgentLine, TodoDisplay, ToolCallLine
 
+# 流式输出：delta 经有界队列交给 UI 消费者，消费者按时间窗口合并后才更新一次 UI，避免逐 token 重绘；
+# 队列满时生产者等待（背压），避免模型输出快于绘制时无限堆积
+_STREAM_QUEUE_SIZE = 64
+_STREAM_FLUSH_INTERVAL = 0.05  # 秒
+
+# 聊天区窗口化：最多保留 N 个已挂载的消息组件，更早的卸载为快照，滚动到顶部时按批恢复
+_CHAT_MAX_MOUNTED = 200
+_CHAT_RESTORE_BATCH = 20
+
 
 class MiniCCApp(App):
     TITLE = "MiniCC"
@@ -75,6 +89,13 @@ class MiniCCApp(App):
         self._subagent_lines: dict[str, SubAgentLine] = {}
         self._current_ask_panel: AskUserPanel | None = None
         self._streaming_assistant_panel: MessagePanel | None = None
+        # 已卸载的聊天组件快照（右端为最近卸载、紧邻当前已挂载部分的那一条）
+        self._chat_evicted: deque[Callable[[], Widget]] = deque()
+        # 已调用 remove 但尚未真正从 DOM 摘除的组件（remove 为异步）
+        self._chat_removing: WeakSet[Widget] = WeakSet()
+        # 待挂载到聊天区的组件：同一轮事件内合并为一次 mount
+        self._pending_chat_mounts: list[Widget] = []
+        self._chat_flush_scheduled = False
 
         # @ 引用文件
         self._mention_active = False
@@ -84,6 +105,16 @@ class MiniCCApp(App):
         self._mention_selected = 0
 
     def _get_git_branch(self) -> str | None:
+        try:
+            git_dir = _find_git_dir(self.runtime.cwd)
+        except Exception:
+            git_dir = None
+        if git_dir is None:
+            return None
+        branch = _read_git_branch(git_dir)
+        if branch is not None:
+            return branch
+        # 解析失败（如非常规仓库布局）时回退到 git 命令
         try:
             result = subprocess.run(
                 ["git", "rev-parse", "--abbrev-ref", "HEAD"],
@@ -130,22 +161,38 @@ class MiniCCApp(App):
         yield Footer(id="footer")
 
     def on_mount(self) -> None:
-        input_widget = self.query_one("#input", ChatInput)
+        # 缓存常用组件引用，避免热路径上反复 query_one 遍历 DOM
+        self._chat = self.query_one("#chat_container", VerticalScroll)
+        self._input = self.query_one("#input", ChatInput)
+        self._todo_display = self.query_one("#todo_display", TodoDisplay)
+        self._bottom_bar = self.query_one("#bottom_bar", BottomBar)
+        self._ask_container = self.query_one("#ask_user_container", Container)
+        self._mention_container = self.query_one("#mention_container", Container)
+
+        input_widget = self._input
         input_widget.focus()
         input_widget.set_mention_key_handler(self._handle_mention_key)
 
-        self.query_one("#ask_user_container", Container).display = False
-        self.query_one("#mention_container", Container).display = False
+        self._ask_container.display = False
+        self._mention_container.display = False
+        self.watch(self._chat, "scroll_y", self._on_chat_scrolled, init=False)
         self._show_welcome()
-        self._wait_fs_ready()
         self._consume_events()
 
     @work(thread=True, group="startup")
     def _wait_fs_ready(self) -> None:
         try:
-            self.runtime.fs.wait_ready(timeout=30.0)
+            self.runtime.fs.get()  # 创建并等待索引就绪（worker 线程中，不阻塞 UI）
         except Exception:
-            pass
+            return
+        # 索引就绪后刷新正在显示的 @ 引用候选
+        self.call_from_thread(self._refresh_mention_results)
+
+    def _refresh_mention_results(self) -> None:
+        if not self._mention_active or not self._mention_query or self._mention_at_pos is None:
+            return
+        items = self._search_files_for_mention(self._mention_query)
+        self._show_mention_panel(self._mention_at_pos, self._mention_query, items)
 
     def _show_welcome(self) -> None:
         self._append_message("**MiniCC** - 极简 AI 编程助手\n\n输入问题开始对话，Ctrl+C 退出", role="system")
@@ -159,7 +206,7 @@ class MiniCCApp(App):
             self._append_message("⚠️ 请等待当前请求完成...", role="system")
             return
 
-        input_widget = self.query_one("#input", ChatInput)
+        input_widget = self._input
         self._hide_mention_panel()
         input_widget.text = ""
         input_widget.cursor_location = (0, 0)
@@ -179,7 +226,7 @@ class MiniCCApp(App):
             self._hide_mention_panel()
             return
 
-        input_widget = self.query_one("#input", ChatInput)
+        input_widget = self._input
         cursor_row, cursor_col = input_widget.cursor_location
         lines = input_widget.text.split("\n")
         current_line = lines[cursor_row] if 0 <= cursor_row < len(lines) else ""
@@ -201,24 +248,30 @@ class MiniCCApp(App):
     @work(exclusive=True, group="chat")
     async def _process_message(self, user_input: str) -> None:
         self._is_processing = True
+        streamed_text = ""
+        stream_queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=_STREAM_QUEUE_SIZE)
+        consumer = asyncio.create_task(self._consume_stream(stream_queue))
+
         try:
-            streamed_text = ""
             async for event in self.runtime.agent.run_stream_events(
                 user_input,
                 deps=self.runtime.deps,
                 message_history=self.messages,
             ):
+                delta = None
                 if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart):
-                    streamed_text += event.part.content
-                    self._update_streaming_assistant(streamed_text)
+                    delta = event.part.content
                 elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
-                    streamed_text += event.delta.content_delta
-                    self._update_streaming_assistant(streamed_text)
+                    delta = event.delta.content_delta
+                if delta:
+                    streamed_text += delta
+                    await stream_queue.put(delta)
                 elif isinstance(event, (FunctionToolCallEvent, BuiltinToolCallEvent)):
+                    # 工具调用前等待已入队的文本渲染完毕，保证展示顺序
+                    await stream_queue.join()
                     part = event.part
                     args = None
                     try:
-                        self.runtime.deps.logger.print(f"part={part}, args={args}")
                         args = part.args_as_dict()
                     except Exception:
                         try:
@@ -242,13 +295,15 @@ class MiniCCApp(App):
                         )
                     )
                 elif isinstance(event, AgentRunResultEvent):
+                    await stream_queue.join()
                     final_text = streamed_text or str(event.result.output)
                     if self._streaming_assistant_panel is not None:
                         self._streaming_assistant_panel.set_content(final_text)
                         self._scroll_chat_end()
                     else:
                         self._append_message(final_text, role="assistant")
-                    self.messages = event.result.all_messages()
+                    # 只追加本轮新增的消息，不再每轮复制整段历史
+                    self.messages.extend(event.result.new_messages())
                     usage = event.result.usage()
                     if usage:
                         self._update_tokens(usage)
@@ -262,33 +317,83 @@ class MiniCCApp(App):
             else:
                 self._append_message(f"❌ 错误: {e}", role="system")
         finally:
+            # 通知消费者渲染剩余文本后退出；队列已满（例如被取消）时直接取消消费者
+            try:
+                stream_queue.put_nowait(None)
+            except asyncio.QueueFull:
+                consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+            if consumer.cancelled():
+                # 消费者未渲染的 delta 仍在队列中：丢弃队列，直接用完整文本补齐面板
+                while not stream_queue.empty():
+                    stream_queue.get_nowait()
+                if streamed_text:
+                    try:
+                        self._update_streaming_assistant(streamed_text)
+                    except Exception as e:
+                        if self.runtime.logger:
+                            self.runtime.logger.print(f"[UI] Stream render failed: {e}")
             self._is_processing = False
             self._scroll_chat_end()
 
+    async def _consume_stream(self, stream_queue: asyncio.Queue[str | None]) -> None:
+        """流式文本消费者：取出当前已入队的全部 delta 合并为一次 UI 更新，None 表示结束"""
+        text = ""
+        while True:
+            batch = [await stream_queue.get()]
+            while not stream_queue.empty():
+                batch.append(stream_queue.get_nowait())
+            done = None in batch
+            chunk = "".join(d for d in batch if d)
+            try:
+                if chunk:
+                    text += chunk
+                    self._update_streaming_assistant(text)
+            except Exception as e:
+                # 渲染失败不能卡住生产者（其可能正阻塞在 put/join 上）
+                if self.runtime.logger:
+                    self.runtime.logger.print(f"[UI] Stream render failed: {e}")
+            finally:
+                for _ in batch:
+                    stream_queue.task_done()
+            if done:
+                return
+            # 让出事件循环给绘制，同时积累下一批 delta
+            await asyncio.sleep(_STREAM_FLUSH_INTERVAL)
+
     @work(group="events")
     async def _consume_events(self) -> None:
-        async for ev in self.runtime.event_bus.iter():
-            if isinstance(ev, ToolCallStarted):
-                self._on_tool_started(ev)
-            elif isinstance(ev, ToolCallFinished):
-                self._on_tool_finished(ev)
-            elif isinstance(ev, TodoUpdated):
-                self._on_todo_updated(ev)
-            elif isinstance(ev, AskUserRequested):
-                self._on_ask_user_requested(ev)
-            elif isinstance(ev, SubAgentCreated):
-                self._on_subagent_created(ev)
-            elif isinstance(ev, SubAgentUpdated):
-                self._on_subagent_updated(ev)
+        bus = self.runtime.event_bus
+        async for first in bus.iter():
+            # 一次处理当前已积压的全部事件，任务面板在这一批结束时只重绘一次
+            with self._todo_display.batch():
+                for ev in (first, *bus.drain()):
+                    self._dispatch_event(ev)
+
+    def _dispatch_event(self, ev: Any) -> None:
+        if isinstance(ev, ToolCallStarted):
+            self._on_tool_started(ev)
+        elif isinstance(ev, ToolCallFinished):
+            self._on_tool_finished(ev)
+        elif isinstance(ev, TodoUpdated):
+            self._on_todo_updated(ev)
+        elif isinstance(ev, AskUserRequested):
+            self._on_ask_user_requested(ev)
+        elif isinstance(ev, SubAgentCreated):
+            self._on_subagent_created(ev)
+        elif isinstance(ev, SubAgentUpdated):
+            self._on_subagent_updated(ev)
 
     def _on_tool_started(self, ev: ToolCallStarted) -> None:
         # 屏蔽某些工具在显示
         if ev.tool_name in ("todo_write",):
             return
         if self.runtime.logger:
-            self.runtime.logger.print(f"[UI] Tool started: {ev.tool_name} (id={ev.tool_call_id}), args={ev.args}")
+            self.runtime.logger.print(
+                f"[UI] Tool started: {ev.tool_name} (id={ev.tool_call_id}), args={_dump_args(ev.args)}"
+            )
         # 添加到任务工具显示
-        todo_display = self.query_one("#todo_display", TodoDisplay)
+        todo_display = self._todo_display
         todo_display.add_tool_call(ev.tool_call_id, ev.tool_name, ev.args)
 
     def _on_tool_finished(self, ev: ToolCallFinished) -> None:
@@ -296,47 +401,41 @@ class MiniCCApp(App):
         if ev.tool_call_id not in self._tool_lines:
             # 但仍需更新 TaskToolDisplay 中的状态
             if ev.tool_name not in ("todo_write",):
-                todo_display = self.query_one("#todo_display", TodoDisplay)
+                todo_display = self._todo_display
                 todo_display.update_tool_call(ev.tool_call_id, "completed" if ev.ok else "failed")
             return
         if self.runtime.logger:
             self.runtime.logger.print(f"[UI] Tool finished: {ev.tool_name} (id={ev.tool_call_id}, ok={ev.ok}, error={ev.error})")
         # 更新 TaskToolDisplay 中的状态
-        todo_display = self.query_one("#todo_display", TodoDisplay)
+        todo_display = self._todo_display
         todo_display.update_tool_call(ev.tool_call_id, "completed" if ev.ok else "failed")
 
     def _on_todo_updated(self, ev: TodoUpdated) -> None:
-        todo_display = self.query_one("#todo_display", TodoDisplay)
+        todo_display = self._todo_display
+        # todo_write 工具已记录本次入参，这里不再重复序列化
         todo_display.update_todos(ev.todos)
-        self.runtime.logger.print("Todo update: %s" % json.dumps([str(t) for t in ev.todos], indent=2))
 
     def _on_ask_user_requested(self, ev: AskUserRequested) -> None:
-        container = self.query_one("#ask_user_container", Container)
+        container = self._ask_container
         container.remove_children()
         panel = AskUserPanel(ev.request_id, ev.questions)
         self._current_ask_panel = panel
         container.mount(panel)
         container.display = True
 
-        main_input = self.query_one("#input", ChatInput)
+        main_input = self._input
         main_input.disabled = True
         self.call_later(panel.focus)
 
     def _hide_ask_panel(self) -> None:
-        try:
-            container = self.query_one("#ask_user_container", Container)
-            container.remove_children()
-            container.display = False
-        except Exception:
-            pass
+        container = self._ask_container
+        container.remove_children()
+        container.display = False
 
         self._current_ask_panel = None
-        try:
-            main_input = self.query_one("#input", ChatInput)
-            main_input.disabled = False
-            main_input.focus()
-        except Exception:
-            pass
+        main_input = self._input
+        main_input.disabled = False
+        main_input.focus()
 
         self._hide_mention_panel()
 
@@ -351,45 +450,39 @@ class MiniCCApp(App):
     def _on_subagent_created(self, ev: SubAgentCreated) -> None:
         line = SubAgentLine(task_id=ev.task_id, prompt=ev.description or ev.prompt, status="pending")
         self._subagent_lines[ev.task_id] = line
-        self._chat_container().mount(line)
-        self._ensure_stream_panel_last()
-        self._scroll_chat_end()
+        self._queue_chat_mount(line)
 
     def _on_subagent_updated(self, ev: SubAgentUpdated) -> None:
         line = self._subagent_lines.get(ev.task_id)
         if line is None:
             line = SubAgentLine(task_id=ev.task_id, prompt=ev.task_id, status=ev.status)
             self._subagent_lines[ev.task_id] = line
-            self._chat_container().mount(line)
+            self._queue_chat_mount(line)
         line.update_status(ev.status)
-        self._ensure_stream_panel_last()
-        self._scroll_chat_end()
 
     def on_todo_display_closed(self, message: TodoDisplay.Closed) -> None:
-        todo_display = self.query_one("#todo_display", TodoDisplay)
+        todo_display = self._todo_display
         todo_display.update_todos([])
         todo_display.display = False
         self.runtime.deps.todos = []
 
     def action_clear(self) -> None:
-        chat = self._chat_container()
-        for child in list(chat.children):
-            child.remove()
+        # 一次性移除全部消息组件（保留 mention 容器），只触发一次布局刷新
+        items = self._chat_items()
+        self._chat_removing.update(items)
+        self._chat.remove_children(items)
 
         self.messages = []
         self._tool_lines.clear()
         self._subagent_lines.clear()
         self._streaming_assistant_panel = None
+        self._chat_evicted.clear()
+        self._pending_chat_mounts.clear()
 
-        try:
-            bottom_bar = self.query_one(BottomBar)
-            bottom_bar.update_info(input_tokens=0, output_tokens=0)
-        except Exception:
-            pass
+        self._bottom_bar.update_info(input_tokens=0, output_tokens=0)
 
-        todo_display = self.query_one("#todo_display", TodoDisplay)
-        todo_display.tasks_with_tools = []  # 清空任务和工具
-        todo_display.update_todos([])
+        # 空列表会同时清空任务及其工具，只需一次刷新
+        self._todo_display.update_todos([])
         self.runtime.deps.todos = []
         self._show_welcome()
 
@@ -401,27 +494,101 @@ class MiniCCApp(App):
         if self._is_processing:
             self._append_message("⚠️ 正在取消...", role="system")
 
-    def _chat_container(self) -> VerticalScroll:
-        return self.query_one("#chat_container", VerticalScroll)
-
-    def _tool_container(self) -> VerticalScroll:
-        return self.query_one("#tool_container", VerticalScroll)
-
     def _append_message(self, content: str, role: str = "assistant") -> MessagePanel:
         panel = MessagePanel(content, role=role)
-        chat = self._chat_container()
-        chat.mount(panel)
+        self._mount_chat(panel)
         self._scroll_chat_end()
         return panel
 
+    # ---------------- 聊天区窗口化 ----------------
+
+    def _chat_items(self) -> list[Widget]:
+        """聊天区中的消息类组件（排除 mention 容器）"""
+        return [
+            w for w in self._chat.children if w is not self._mention_container and w not in self._chat_removing
+        ]
+
+    def _mount_chat(self, widget: Widget) -> None:
+        self._chat.mount(widget)
+        self._evict_old_chat_items()
+
+    def _queue_chat_mount(self, widget: Widget) -> None:
+        """延迟到下一次刷新后批量挂载（子代理 fan-out 时避免逐个 mount + 布局）"""
+        self._pending_chat_mounts.append(widget)
+        if not self._chat_flush_scheduled:
+            self._chat_flush_scheduled = True
+            self.call_after_refresh(self._flush_chat_mounts)
+
+    def _flush_chat_mounts(self) -> None:
+        self._chat_flush_scheduled = False
+        widgets, self._pending_chat_mounts = self._pending_chat_mounts, []
+        if not widgets:
+            return
+        # 流式回复面板保持在最后：直接插到它前面，无需先移除再重新挂载
+        panel = self._streaming_assistant_panel
+        if panel is not None and panel.parent is self._chat and panel not in self._chat_removing:
+            self._chat.mount(*widgets, before=panel)
+        else:
+            self._chat.mount(*widgets)
+        self._evict_old_chat_items()
+        self._scroll_chat_end()
+
+    def _evict_old_chat_items(self) -> None:
+        items = self._chat_items()
+        overflow = len(items) - _CHAT_MAX_MOUNTED
+        if overflow <= 0:
+            return
+        evicted: list[Widget] = []
+        for widget in items:
+            if len(evicted) >= overflow:
+                break
+            if widget is self._streaming_assistant_panel:
+                continue
+            snapshot = self._snapshot_chat_item(widget)
+            if snapshot is not None:
+                self._chat_evicted.append(snapshot)
+            evicted.append(widget)
+        if evicted:
+            self._chat_removing.update(evicted)
+            self._chat.remove_children(evicted)
+
+    def _snapshot_chat_item(self, widget: Widget) -> Callable[[], Widget] | None:
+        """生成可重建组件的轻量快照；未知组件直接丢弃"""
+        if isinstance(widget, MessagePanel):
+            content, role = widget._content, widget.role
+            return lambda: MessagePanel(content, role=role)
+        if isinstance(widget, SubAgentLine):
+            task_id = widget.task_id
+
+            def restore() -> Widget:
+                # 卸载期间状态可能已更新：以最新记录的组件为准重建，并替换映射
+                old = self._subagent_lines.get(task_id, widget)
+                line = SubAgentLine(task_id=task_id, prompt=old.prompt, status=old.status)
+                self._subagent_lines[task_id] = line
+                return line
+
+            return restore
+        return None
+
+    def _on_chat_scrolled(self, scroll_y: float) -> None:
+        if scroll_y > 0 or not self._chat_evicted:
+            return
+        restored: list[Widget] = []
+        while self._chat_evicted and len(restored) < _CHAT_RESTORE_BATCH:
+            restored.append(self._chat_evicted.pop()())
+        restored.reverse()
+        self._chat.mount(*restored, after=self._mention_container)
+
+        # 保持视口停留在恢复前的位置
+        chat = self._chat
+        chat.call_after_refresh(
+            lambda: chat.scroll_to(y=sum(w.outer_size.height for w in restored), animate=False)
+        )
+
     def _scroll_chat_end(self) -> None:
-        chat = self._chat_container()
+        chat = self._chat
         chat.call_after_refresh(chat.scroll_end, animate=False)
 
-    def _scroll_tool_end(self) -> None:
-        tools = self._tool_container()
-        tools.call_after_refresh(tools.scroll_end, animate=False)
-
     def _complete_all_pending_todos(self) -> None:
         """完成所有进行中和待处理的任务"""
         from minicc.core.models import TodoItem
@@ -435,7 +602,7 @@ class MiniCCApp(App):
 
         if updated:
             self.runtime.deps.todos = todos
-            todo_display = self.query_one("#todo_display", TodoDisplay)
+            todo_display = self._todo_display
             todo_display.update_todos(todos)
 
     def _update_streaming_assistant(self, content: str) -> None:
@@ -444,19 +611,9 @@ class MiniCCApp(App):
         self._streaming_assistant_panel.set_content(content)
         self._scroll_chat_end()
 
-    def _ensure_stream_panel_last(self) -> None:
-        if self._streaming_assistant_panel is None:
-            return
-        chat = self._chat_container()
-        try:
-            self._streaming_assistant_panel.remove()
-        except Exception:
-            return
-        chat.mount(self._streaming_assistant_panel)
-
     def _update_tokens(self, usage: Any) -> None:
         try:
-            bottom_bar = self.query_one(BottomBar)
+            bottom_bar = self._bottom_bar
             input_tokens = getattr(usage, "request_tokens", 0) or getattr(usage, "input_tokens", 0)
             output_tokens = getattr(usage, "response_tokens", 0) or getattr(usage, "output_tokens", 0)
             bottom_bar.add_tokens(input_tokens, output_tokens)
@@ -472,10 +629,10 @@ class MiniCCApp(App):
         self._mention_items = items
         self._mention_selected = 0
         self._refresh_mention_panel()
-        self.call_later(self.query_one("#input", ChatInput).focus)
+        self.call_later(self._input.focus)
 
     def _refresh_mention_panel(self) -> None:
-        container = self.query_one("#mention_container", Container)
+        container = self._mention_container
         container.remove_children()
         panel = FileMentionPanel(self._mention_query, self._mention_items, self._mention_selected)
         container.mount(panel)
@@ -489,12 +646,9 @@ class MiniCCApp(App):
         self._mention_query = ""
         self._mention_items = []
         self._mention_selected = 0
-        try:
-            container = self.query_one("#mention_container", Container)
-            container.remove_children()
-            container.display = False
-        except Exception:
-            pass
+        container = self._mention_container
+        container.remove_children()
+        container.display = False
 
     def _handle_mention_key(self, key: str) -> bool:
         if not self._mention_active:
@@ -523,7 +677,7 @@ class MiniCCApp(App):
             return
 
         selected = self._mention_items[self._mention_selected]
-        input_widget = self.query_one("#input", ChatInput)
+        input_widget = self._input
         cursor_row, cursor_col = input_widget.cursor_location
         lines = (input_widget.text.split("\n") or [""])
         if cursor_row >= len(lines):
@@ -544,6 +698,10 @@ class MiniCCApp(App):
 
     def _search_files_for_mention(self, query: str) -> list[str]:
         fs = getattr(self.runtime, "fs", None)
+        if isinstance(fs, LazyFileSystem) and not fs.loaded:
+            # 首次引用文件时在后台建立索引，避免阻塞 UI；本次先返回空结果
+            self._wait_fs_ready()
+            return []
         ignored = {".git", ".venv", "dist", "__pycache__", ".pytest_cache"}
 
         def is_ignored(p: str) -> bool:
@@ -580,6 +738,34 @@ class MiniCCApp(App):
         return results
 
 
+def _find_git_dir(cwd: str) -> Path | None:
+    """自 cwd 向上查找 .git（目录，或 worktree/submodule 的 `gitdir: ...` 文件）"""
+    for base in (Path(cwd), *Path(cwd).parents):
+        dot_git = base / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            content = dot_git.read_text(encoding="utf-8").strip()
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = Path(content[len("gitdir:"):].strip())
+            return git_dir if git_dir.is_absolute() else base / git_dir
+    return None
+
+
+def _read_git_branch(git_dir: Path) -> str | None:
+    """直接读取 HEAD 获取当前分支（避免启动时 fork git 进程）；分离 HEAD 时返回短哈希"""
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except Exception:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    if head.startswith("ref:"):
+        return None
+    return head[:8] or None
+
+
 _AT_PATTERN = re.compile(r"(^|[\\s\\(\\[\\{\\\"'])@([^\\s@]*)$")
 
 
@@ -593,6 +779,14 @@ def _find_at_reference(text: str, cursor_pos: int) -> tuple[int, str] | None:
     return at_pos, query
 
 
+def _dump_args(args: dict[str, Any] | None) -> str:
+    """工具参数按 JSON 写入日志（有 orjson 时走 C 实现），无法序列化时退回 repr。"""
+    try:
+        return jsonio.dumps(args)
+    except (TypeError, ValueError):
+        return repr(args)
+
+
 def _tool_result_to_status(result_part: ToolReturnPart | RetryPromptPart) -> tuple[bool, str | None]:
     if isinstance(result_part, RetryPromptPart):
         return False, str(result_part.content)
@@ -609,5 +803,37 @@ def _tool_result_to_status(result_part: ToolReturnPart | RetryPromptPart) -> tup
     return True, None
 
 
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """优先使用 uvloop（可选依赖 speedups，libuv 实现的子进程/管道 I/O 更快），未安装时回退标准事件循环。"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    loop = uvloop.new_event_loop()
+    if _supports_eager_tasks(loop):
+        return loop
+    loop.close()
+    return asyncio.new_event_loop()
+
+
+def _supports_eager_tasks(loop: asyncio.AbstractEventLoop) -> bool:
+    """Textual 会给事件循环装 asyncio.eager_task_factory；部分 uvloop/Python 组合不兼容（create_task 抛 TypeError）。"""
+    factory = getattr(asyncio, "eager_task_factory", None)
+    if factory is None:
+        return True
+    probe = asyncio.sleep(0)
+    loop.set_task_factory(factory)
+    try:
+        loop.run_until_complete(probe)
+        return True
+    except TypeError:
+        probe.close()
+        return False
+    finally:
+        loop.set_task_factory(None)
+
+
 def main() -> None:
-    MiniCCApp().run()
+    # Runner 负责设置当前事件循环，并在退出时回收异步生成器与默认线程池
+    with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+        MiniCCApp().run(loop=runner.get_loop())
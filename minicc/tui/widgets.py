@@ -8,11 +8,15 @@ from __future__ import annotations
 
 import math
 import time
+from bisect import bisect_right
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any
+from itertools import groupby, islice
+from typing import Any, Iterator
 
 from rich.markdown import Markdown
 from rich.panel import Panel
+from rich.style import Style
 from rich.text import Text
 from textual.message import Message
 from textual.widgets import Static
@@ -20,6 +24,63 @@ from textual.widgets import Static
 from minicc.core.models import DiffLine, TodoItem
 
 
+def _pulse_style(intensity: float) -> str:
+    """脉冲强度 (0.0 ~ 1.0) 对应的样式"""
+    if intensity > 0.85:
+        return "bold yellow"
+    elif intensity > 0.7:
+        return "yellow"
+    elif intensity > 0.55:
+        return "yellow dim"
+    elif intensity > 0.4:
+        return "yellow dim dim"
+    else:
+        return "dim yellow"
+
+
+# 预构造的 Style 对象：Text.append 直接使用，不必在渲染时按名称解析样式字符串
+_S_DIM = Style(dim=True)
+_S_CYAN = Style(color="cyan")
+_S_GREEN = Style(color="green")
+_S_RED = Style(color="red")
+_S_YELLOW = Style(color="yellow")
+_S_MAGENTA = Style(color="magenta")
+_S_BOLD_YELLOW = Style(color="yellow", bold=True)
+_S_BOLD_MAGENTA = Style(color="magenta", bold=True)
+
+# 一个脉冲周期内按相位等分的样式表：强度 = 0.65 + 0.35 * sin(2π·phase)
+_PULSE_STEPS = 64
+_PULSE_STYLES: tuple[Style, ...] = tuple(
+    Style.parse(_pulse_style(0.65 + 0.35 * math.sin(2 * math.pi * i / _PULSE_STEPS))) for i in range(_PULSE_STEPS)
+)
+
+# 各组件共用的状态图标/样式表（模块级常量，避免每次重绘都新建字典）
+_STATUS_ICON: dict[str, str] = {
+    "pending": " ⏳",
+    "running": " 🔄",
+    "completed": " ✅",
+    "failed": " ❌",
+}
+_STATUS_STYLE: dict[str, Style] = {"completed": _S_GREEN, "failed": _S_RED, "running": _S_YELLOW, "pending": _S_DIM}
+# 工具参数摘要优先展示的参数名（按顺序取第一个存在的）
+_SUMMARY_KEYS = ("path", "file_path", "pattern", "command", "query", "prompt")
+# 任务面板中非进行中任务的标题样式（进行中任务使用脉冲样式）
+_TASK_TITLE_STYLE: dict[str, Style] = {"completed": _S_GREEN}
+# 任务面板树状工具列表：连接线与状态圆点
+_TREE_MID = "├── "
+_TREE_LAST = "└── "
+_TREE_ICON: dict[str, str] = {"running": "🟠", "completed": "🟢", "failed": "🔴"}
+_ROLE_STYLE: dict[str, tuple[str, str]] = {
+    "user": ("blue", "You"),
+    "assistant": ("green", "Assistant"),
+    "system": ("magenta", "System"),
+}
+
+# DiffView：行类型 -> (前缀, 样式)
+_DIFF_STYLE: dict[str, tuple[str, Style]] = {"add": ("+ ", _S_GREEN), "remove": ("- ", _S_RED)}
+_DIFF_CONTEXT_STYLE = ("  ", _S_DIM)
+
+
 @dataclass
 class ToolCallItem:
     """工具调用项"""
@@ -27,6 +88,7 @@ class ToolCallItem:
     tool_name: str
     args: dict | None
     status: str = "running"  # running, completed, failed
+    summary: str = ""  # 参数摘要（创建时计算一次，args 之后不再变化）
 
 
 @dataclass
@@ -51,130 +113,181 @@ class TaskToolDisplay(Static):
         pass
 
     # 动画配置
-    _ANIMATION_INTERVAL = 0.05  # 刷新间隔（秒）
+    _ANIMATION_INTERVAL = 0.1  # 刷新间隔（秒，10Hz 对细微的脉冲动画已足够）；无进行中任务时定时器暂停
+    _DOTS_TICKS = 5  # 省略号每 5 个刷新周期变化一次
     _PULSE_PERIOD = 2.0  # 脉冲周期（秒）
+    _PULSE_SCALE = _PULSE_STEPS / _PULSE_PERIOD  # 秒 -> 脉冲表下标
+    _MAX_VISIBLE_TOOLS = 20  # 每个任务最多展示的工具调用数（保留最近的）
 
     def __init__(self, **kwargs):
         self.tasks_with_tools: list[TaskWithTools] = []
         self._timer = None
         self._current_active_task_index: int | None = None  # 跟踪当前活跃任务
+        self._last_frame: tuple[Style, str] | None = None  # 上次刷新时的 (脉冲样式, 省略号)
+        # 渲染缓存：(动画帧, Panel)；数据变化时由 _invalidate 清空，仅动画帧变化时才重建
+        self._render_cache: tuple[tuple[Style, str] | None, Panel] | None = None
+        self._dirty = False  # 工具事件积攒的待刷新标记，由定时器统一刷新
+        self._batch_depth = 0  # batch() 嵌套层数；期间的数据变化在退出时统一重绘一次
+        self._batch_dirty = False
+        # 查找索引：todo.content -> 任务，tool_call_id -> 工具项（随增删同步维护）
+        self._content_index: dict[str, TaskWithTools] = {}
+        self._tool_index: dict[str, ToolCallItem] = {}
+        # 工具调用的归属任务（由 update_todos 维护）
+        self._active_task: TaskWithTools | None = None
+        self._last_pending: TaskWithTools | None = None
+        # 上次构建面板时各任务的内容行范围（点击命中检测用）
+        self._task_line_ranges: list[tuple[int, int]] = []
+        self._task_starts: list[int] = []
         super().__init__(**kwargs)
-        self._start_animation()
 
-    def _start_animation(self) -> None:
-        """启动动画定时器"""
-        self._timer = self.set_timer(self._ANIMATION_INTERVAL, self._on_timer)
+    def on_mount(self) -> None:
+        """挂载时创建唯一的动画定时器（固定间隔，空闲时暂停）"""
+        self._timer = self.set_interval(
+            self._ANIMATION_INTERVAL, self._on_timer, pause=self._current_active_task_index is None
+        )
 
     def _on_timer(self) -> None:
-        """定时器回调，周期性刷新实现动画效果"""
+        """定时器回调：合并工具事件的刷新，检查动画帧（仅在可见样式变化时刷新）；空闲时暂停定时器"""
+        refresh, self._dirty = self._dirty, False
+        if self._current_active_task_index is None:
+            if self._timer is not None:
+                self._timer.pause()
+        elif self.display and self.region:
+            # 不可见（被隐藏、滚出视口或尚未布局）时跳过动画帧；Textual 本身也不会绘制不可见组件
+            frame = self._frame(time.monotonic())
+            if frame != self._last_frame:
+                self._last_frame = frame
+                refresh = True
+        if refresh:
+            self.refresh()
+
+    def _resume_animation(self) -> None:
+        """出现进行中任务时恢复动画定时器"""
+        if self._current_active_task_index is not None and self._timer is not None:
+            self._timer.resume()
+
+    def _invalidate(self) -> None:
+        """任务/工具数据变化：丢弃渲染缓存并重绘"""
+        self._render_cache = None
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
         self.refresh()
-        self._timer = self.set_timer(self._ANIMATION_INTERVAL, self._on_timer)
-
-    def _get_pulse_intensity(self) -> float:
-        """计算当前脉冲强度 (0.0 ~ 1.0)"""
-        phase = (time.time() % self._PULSE_PERIOD) / self._PULSE_PERIOD
-        intensity = 0.65 + 0.35 * math.sin(2 * math.pi * phase)
-        return intensity
-
-    def _get_in_progress_style(self) -> str:
-        """获取进行中任务的样式"""
-        intensity = self._get_pulse_intensity()
-        if intensity > 0.85:
-            return "bold yellow"
-        elif intensity > 0.7:
-            return "yellow"
-        elif intensity > 0.55:
-            return "yellow dim"
-        elif intensity > 0.4:
-            return "yellow dim dim"
-        else:
-            return "dim yellow"
 
-    def _get_loading_dots(self) -> str:
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """合并一组连续的数据变化：期间不重绘，退出最外层时（如有变化）只刷新一次"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_dirty:
+                self._batch_dirty = False
+                self.refresh()
+
+    def _mark_dirty(self) -> None:
+        """工具调用变化：丢弃渲染缓存，重绘推迟到下一个定时器节拍（事件密集时每帧最多一次）"""
+        self._render_cache = None
+        if self._timer is None:  # 尚未挂载，没有定时器可合并
+            self.refresh()
+            return
+        self._dirty = True
+        self._timer.resume()
+
+    def _frame(self, now: float) -> tuple[Style, str]:
+        """当前动画帧：(脉冲样式, 省略号)"""
+        return self._get_in_progress_style(now), self._get_loading_dots(now)
+
+    def _get_in_progress_style(self, now: float) -> Style:
+        """获取进行中任务的样式（查预计算的脉冲表，不在每帧做三角运算）"""
+        return _PULSE_STYLES[int(now * self._PULSE_SCALE) % _PULSE_STEPS]
+
+    def _get_loading_dots(self, now: float) -> str:
         """获取动态省略号"""
-        cycle = int(time.time() * 2) % 3
+        cycle = int(now / (self._ANIMATION_INTERVAL * self._DOTS_TICKS)) % 3
         return "." * (cycle + 1)
 
     def update_todos(self, todos: list[TodoItem]) -> None:
         """更新任务列表，保留已有任务的工具关联，并更新活跃任务索引"""
-        # 创建旧的 todo -> TaskWithTools 映射
-        old_map = {tw.todo.content: tw for tw in self.tasks_with_tools}
+        was_active = self._current_active_task_index is not None
+        tasks = self.tasks_with_tools
+        if len(todos) == len(tasks) and all(tw.todo.content == todo.content for tw, todo in zip(tasks, todos)):
+            # 常见情况：任务集合与顺序不变、只有状态变化——原地更新，不重建映射与列表
+            for tw, todo in zip(tasks, todos):
+                tw.todo = todo
+        else:
+            self._rebuild_tasks(todos)
+            tasks = self.tasks_with_tools
+
+        # 工具调用的归属：最后一个 in_progress 任务，没有则归到最后一个 pending 任务
+        active_index: int | None = None
+        last_pending: TaskWithTools | None = None
+        for i, tw in enumerate(tasks):
+            status = tw.todo.status
+            if status == "in_progress":
+                active_index = i
+            elif status == "pending":
+                last_pending = tw
+        self._current_active_task_index = active_index
+        self._active_task = tasks[active_index] if active_index is not None else None
+        self._last_pending = last_pending
+        self._invalidate()
+        if not was_active:
+            self._resume_animation()
+
+    def _rebuild_tasks(self, todos: list[TodoItem]) -> None:
+        """任务有增删或重排：按 content 复用已有任务对象，并同步两个索引"""
+        # 旧的 todo.content -> TaskWithTools 映射
+        old_map = self._content_index
 
         new_tasks: list[TaskWithTools] = []
-        for i, todo in enumerate(todos):
-            if todo.content in old_map:
+        new_map: dict[str, TaskWithTools] = {}
+        for todo in todos:
+            tw = old_map.get(todo.content)
+            if tw is not None:
                 # 保留已有的任务及其工具
-                tw = old_map[todo.content]
                 tw.todo = todo
-                new_tasks.append(tw)
-                # 更新活跃任务索引
-                if todo.status == "in_progress":
-                    self._current_active_task_index = i
             else:
                 # 新任务
-                new_tasks.append(TaskWithTools(todo=todo, tools=[]))
-                # 新任务如果是 in_progress，更新活跃索引
-                if todo.status == "in_progress":
-                    self._current_active_task_index = i
+                tw = TaskWithTools(todo=todo, tools=[])
+            new_tasks.append(tw)
+            new_map[todo.content] = tw
 
-        # 如果没有 in_progress 的任务，重置活跃索引
-        if not any(t.todo.status == "in_progress" for t in new_tasks):
-            self._current_active_task_index = None
+        # 被移除的任务：其工具也从索引中清除
+        for content, tw in old_map.items():
+            if new_map.get(content) is not tw:
+                for tool in tw.tools:
+                    self._tool_index.pop(tool.tool_call_id, None)
 
         self.tasks_with_tools = new_tasks
-        self.refresh()
+        self._content_index = new_map
 
     def add_tool_call(self, tool_call_id: str, tool_name: str, args: dict | None) -> None:
-        """添加工具调用到当前活跃任务"""
-        # 优先使用活跃任务索引
-        if self._current_active_task_index is not None:
-            if 0 <= self._current_active_task_index < len(self.tasks_with_tools):
-                tw = self.tasks_with_tools[self._current_active_task_index]
-                tool = ToolCallItem(
-                    tool_call_id=tool_call_id,
-                    tool_name=tool_name,
-                    args=args,
-                    status="running"
-                )
-                tw.tools.append(tool)
-                self.refresh()
-                return
-
-        # 备用方案：找到第一个 in_progress 或最后一个 pending 任务
-        for i, tw in enumerate(self.tasks_with_tools):
-            if tw.todo.status == "in_progress":
-                tool = ToolCallItem(
-                    tool_call_id=tool_call_id,
-                    tool_name=tool_name,
-                    args=args,
-                    status="running"
-                )
-                tw.tools.append(tool)
-                self._current_active_task_index = i  # 更新活跃索引
-                self.refresh()
-                return
-
-        # 如果没有 in_progress，添加到最后一个 pending 任务
-        for i in range(len(self.tasks_with_tools) - 1, -1, -1):
-            if self.tasks_with_tools[i].todo.status == "pending":
-                tool = ToolCallItem(
-                    tool_call_id=tool_call_id,
-                    tool_name=tool_name,
-                    args=args,
-                    status="running"
-                )
-                self.tasks_with_tools[i].tools.append(tool)
-                self.refresh()
-                return
+        """添加工具调用到当前活跃任务（没有则归到最后一个 pending 任务）"""
+        target = self._active_task or self._last_pending
+        if target is None:
+            return
+        self._append_tool(target, tool_call_id, tool_name, args)
+        self._mark_dirty()
+
+    def _append_tool(self, tw: TaskWithTools, tool_call_id: str, tool_name: str, args: dict | None) -> None:
+        tool = ToolCallItem(
+            tool_call_id=tool_call_id,
+            tool_name=tool_name,
+            args=args,
+            status="running",
+            summary=self._get_tool_summary(args),
+        )
+        tw.tools.append(tool)
+        self._tool_index[tool_call_id] = tool
 
     def update_tool_call(self, tool_call_id: str, status: str) -> None:
         """更新工具调用状态"""
-        for tw in self.tasks_with_tools:
-            for tool in tw.tools:
-                if tool.tool_call_id == tool_call_id:
-                    tool.status = status
-                    self.refresh()
-                    return
+        tool = self._tool_index.get(tool_call_id)
+        if tool is not None:
+            tool.status = status
+            self._mark_dirty()
 
     def get_in_progress_task_index(self) -> int | None:
         """获取进行中任务的索引"""
@@ -187,17 +300,15 @@ class TaskToolDisplay(Static):
         """切换任务的展开/折叠状态"""
         if 0 <= index < len(self.tasks_with_tools):
             self.tasks_with_tools[index].expanded = not self.tasks_with_tools[index].expanded
-            self.refresh()
+            self._invalidate()
 
     async def on_click(self, event) -> None:
-        """处理点击事件：点击任务标题切换展开/折叠"""
-        # 简单实现：根据点击的 y 坐标判断点击了哪个任务
-        line_height = 1  # 每行高度
-        for i, tw in enumerate(self.tasks_with_tools):
-            task_line_start = i * 3  # 每个任务约占3行（标题+工具）
-            if task_line_start <= event.y < task_line_start + 1:
-                self.toggle_task_expand(i)
-                return
+        """处理点击事件：点击任务（标题或其工具行）切换展开/折叠"""
+        # 行号映射在构建面板时记录；event.y 含顶部边框一行（不考虑长行折行）
+        row = event.y - 1
+        idx = bisect_right(self._task_starts, row) - 1
+        if idx >= 0 and row < self._task_line_ranges[idx][1]:
+            self.toggle_task_expand(idx)
 
     def on_unmount(self) -> None:
         """组件卸载时清理定时器"""
@@ -208,27 +319,19 @@ class TaskToolDisplay(Static):
         """渲染工具状态行"""
         text = Text()
         # 工具名称
-        text.append(f"  🔧 {tool.tool_name}", style="cyan")
+        text.append(f"  🔧 {tool.tool_name}", style=_S_CYAN)
         # 参数摘要
-        summary = self._get_tool_summary(tool.args)
-        if summary:
-            text.append(f" {summary}", style="dim")
+        if tool.summary:
+            text.append(f" {tool.summary}", style=_S_DIM)
         # 状态图标
-        icon = {
-            "running": " 🔄",
-            "completed": " ✅",
-            "failed": " ❌",
-        }.get(tool.status, " ❓")
-        style = {"completed": "green", "failed": "red", "running": "yellow"}.get(tool.status, "dim")
-        text.append(icon, style=style)
+        text.append(_STATUS_ICON.get(tool.status, " ❓"), style=_STATUS_STYLE.get(tool.status, _S_DIM))
         return text
 
     def _get_tool_summary(self, args: dict | None) -> str:
         """获取工具参数摘要"""
         if not args:
             return ""
-        key_params = ["path", "file_path", "pattern", "command", "query", "prompt"]
-        for key in key_params:
+        for key in _SUMMARY_KEYS:
             if key in args:
                 value = str(args[key])
                 if len(value) > 20:
@@ -237,58 +340,62 @@ class TaskToolDisplay(Static):
         return ""
 
     def render(self) -> Panel:
+        # 每帧只读一次单调时钟，脉冲与省略号共用同一相位（不受系统时间调整影响）
+        frame = self._frame(time.monotonic()) if self._current_active_task_index is not None else None
+        cached = self._render_cache
+        if cached is not None and cached[0] == frame:
+            return cached[1]
+        panel = self._build_panel(frame)
+        self._render_cache = (frame, panel)
+        return panel
+
+    def _build_panel(self, frame: tuple[Style, str] | None) -> Panel:
         if not self.tasks_with_tools:
-            return Panel(Text("暂无任务", style="dim"), title="📋 任务", border_style="dim")
+            self._task_line_ranges, self._task_starts = [], []
+            return Panel(Text("暂无任务", style=_S_DIM), title="📋 任务", border_style="dim")
 
         text = Text()
         total = len(self.tasks_with_tools)
         done = sum(1 for tw in self.tasks_with_tools if tw.todo.status == "completed")
+        ranges: list[tuple[int, int]] = []
+        row = 0
 
         for idx, tw in enumerate(self.tasks_with_tools, 1):
+            start = row
+            row += 1
             # 任务标题（树状结构）
+            text.append(f"{idx}. ", style=_S_DIM)
             if tw.todo.status == "in_progress":
-                pulse_style = self._get_in_progress_style()
-                dots = self._get_loading_dots()
-                text.append(f"{idx}. ", style="dim")
+                pulse_style, dots = frame or self._frame(time.monotonic())
                 text.append(f"{tw.todo.content}{dots}\n", style=pulse_style)
-            elif tw.todo.status == "completed":
-                text.append(f"{idx}. ", style="dim")
-                text.append(f"{tw.todo.content}\n", style="green")
-            else:  # pending
-                text.append(f"{idx}. ", style="dim")
-                text.append(f"{tw.todo.content}\n", style="dim")
+            else:  # completed / pending
+                text.append(f"{tw.todo.content}\n", style=_TASK_TITLE_STYLE.get(tw.todo.status, _S_DIM))
 
             # 如果展开，显示工具列表（树状缩进）
             if tw.expanded and tw.tools:
-                for tool_idx, tool in enumerate(tw.tools):
-                    # 树状连接线
-                    is_last = tool_idx == len(tw.tools) - 1
-                    if is_last:
-                        tree_prefix = "└── "
-                    else:
-                        tree_prefix = "├── "
-
-                    # 工具状态图标
-                    icon = {
-                        "running": "🟠",
-                        "completed": "🟢",
-                        "failed": "🔴",
-                    }.get(tool.status, "⚪")
-
+                # 工具很多时只展示最近 _MAX_VISIBLE_TOOLS 个，更早的折叠为一行
+                hidden = len(tw.tools) - self._MAX_VISIBLE_TOOLS
+                visible = tw.tools[hidden:] if hidden > 0 else tw.tools
+                if hidden > 0:
+                    text.append(f"{_TREE_MID}… 更早的 {hidden} 个工具调用\n", style=_S_DIM)
+                    row += 1
+                last = len(visible) - 1
+                for tool_idx, tool in enumerate(visible):
+                    # 树状连接线 + 工具状态图标（同为 dim，合并为一段）
+                    tree_prefix = _TREE_LAST if tool_idx == last else _TREE_MID
+                    text.append(f"{tree_prefix}{_TREE_ICON.get(tool.status, '⚪')} ", style=_S_DIM)
                     # 工具名称
-                    tool_text = Text()
-                    tool_text.append(tree_prefix, style="dim")
-                    tool_text.append(f"{icon} ", style="dim")
-                    tool_text.append(tool.tool_name)
-
+                    text.append(tool.tool_name)
                     # 参数摘要
-                    summary = self._get_tool_summary(tool.args)
-                    if summary:
-                        tool_text.append(f" {summary}", style="dim")
-
-                    text.append_text(tool_text)
+                    if tool.summary:
+                        text.append(f" {tool.summary}", style=_S_DIM)
                     text.append("\n")
+                row += len(visible)
+            ranges.append((start, row))
 
+        # 每个任务占据的内容行 [start, end)，供 on_click 二分查找
+        self._task_line_ranges = ranges
+        self._task_starts = [start for start, _ in ranges]
         all_done = done == total and total > 0
         title = "📋 任务 ✓ 全部完成" if all_done else f"📋 任务 [{done}/{total}]"
         border = "green" if all_done else "cyan"
@@ -300,21 +407,26 @@ class MessagePanel(Static):
     def __init__(self, content: str, role: str = "user", **kwargs):
         self.role = role
         self._content = content
+        # 角色创建后不变：边框颜色与标题只解析一次
+        self._border_color, self._title = _ROLE_STYLE.get(role, ("white", role.title()))
+        # Markdown 解析结果按内容缓存：同一内容版本的多次重绘不重复解析
+        self._cache_key: str | None = None
+        self._cache_panel: Panel | None = None
         super().__init__(content, markup=False, **kwargs)
 
     def set_content(self, content: str) -> None:
+        # 流式输出已由 app 按 50ms 批量合并；结束时写回的最终文本通常与已流式内容相同，跳过重排
+        if content == self._content:
+            return
         self._content = content
         self.update(content)
 
     def render(self) -> Panel:
-        role_style = {
-            "user": ("blue", "You"),
-            "assistant": ("green", "Assistant"),
-            "system": ("magenta", "System"),
-        }
-        color, title = role_style.get(self.role, ("white", self.role.title()))
-        markdown = Markdown(self._content or "", code_theme="monokai", justify="left")
-        return Panel(markdown, title=title, border_style=color, expand=True)
+        if self._content != self._cache_key or self._cache_panel is None:
+            markdown = Markdown(self._content or "", code_theme="monokai", justify="left")
+            self._cache_key = self._content
+            self._cache_panel = Panel(markdown, title=self._title, border_style=self._border_color, expand=True)
+        return self._cache_panel
 
 
 class ToolCallLine(Static):
@@ -322,43 +434,52 @@ class ToolCallLine(Static):
         self.tool_name = tool_name
         self.args = args or {}
         self.status = status
+        # 渲染结果只随状态变化，按输入缓存，重绘时直接复用
+        self._cache_key: tuple | None = None
+        self._cache_text: Text | None = None
+        # 参数摘要只取决于 args，按 id(args) 缓存，状态变化重建文本时不必再扫描/截断
+        self._summary_cache: tuple[int, str] | None = None
         super().__init__(**kwargs)
 
     def update_status(self, status: str) -> None:
+        if status == self.status:
+            return
         self.status = status
         self.refresh()
 
     def render(self) -> Text:
+        key = (self.status, self.tool_name, id(self.args))
+        if key != self._cache_key or self._cache_text is None:
+            self._cache_key, self._cache_text = key, self._build_text()
+        return self._cache_text
+
+    def _build_text(self) -> Text:
         text = Text()
-        text.append("  🔧 ", style="yellow")
-        text.append(self.tool_name, style="bold yellow")
+        text.append("  🔧 ", style=_S_YELLOW)
+        text.append(self.tool_name, style=_S_BOLD_YELLOW)
 
         summary = self._get_summary()
         if summary:
-            text.append(f" {summary}", style="dim")
-
-        icon = {
-            "pending": " ⏳",
-            "running": " 🔄",
-            "completed": " ✅",
-            "failed": " ❌",
-        }.get(self.status, " ❓")
-        style = {"completed": "green", "failed": "red", "running": "yellow", "pending": "dim"}.get(
-            self.status, "dim"
-        )
-        text.append(icon, style=style)
+            text.append(f" {summary}", style=_S_DIM)
+
+        text.append(_STATUS_ICON.get(self.status, " ❓"), style=_STATUS_STYLE.get(self.status, _S_DIM))
         return text
 
     def _get_summary(self) -> str:
-        key_params = ["path", "file_path", "pattern", "command", "query", "prompt"]
-        for key in key_params:
+        cached = self._summary_cache
+        if cached is not None and cached[0] == id(self.args):
+            return cached[1]
+        summary = ""
+        for key in _SUMMARY_KEYS:
             if key in self.args:
                 value = str(self.args[key])
                 # 截断参数值，确保状态图标可见
                 if len(value) > 25:
                     value = value[:25] + "..."
-                return f"({value})"
-        return ""
+                summary = f"({value})"
+                break
+        self._summary_cache = (id(self.args), summary)
+        return summary
 
 
 class SubAgentLine(Static):
@@ -366,47 +487,67 @@ class SubAgentLine(Static):
         self.task_id = task_id
         self.prompt = prompt
         self.status = status
+        self._cache_key: tuple | None = None
+        self._cache_text: Text | None = None
         super().__init__(**kwargs)
 
     def update_status(self, status: str) -> None:
+        if status == self.status:  # 重复的状态事件不触发重绘
+            return
         self.status = status
         self.refresh()
 
     def render(self) -> Text:
+        key = (self.status, self.prompt)
+        if key != self._cache_key or self._cache_text is None:
+            self._cache_key, self._cache_text = key, self._build_text()
+        return self._cache_text
+
+    def _build_text(self) -> Text:
         text = Text()
-        text.append("  🤖 ", style="magenta")
+        text.append("  🤖 ", style=_S_MAGENTA)
         prompt_short = self.prompt[:50] + "..." if len(self.prompt) > 50 else self.prompt
-        text.append(prompt_short, style="bold magenta")
-        icon = {
-            "pending": " ⏳",
-            "running": " 🔄",
-            "completed": " ✅",
-            "failed": " ❌",
-        }.get(self.status, " ❓")
-        text.append(icon)
+        text.append(prompt_short, style=_S_BOLD_MAGENTA)
+        text.append(_STATUS_ICON.get(self.status, " ❓"))
         return text
 
 
 class DiffView(Static):
+    _MAX_LINES = 2000  # 单个 diff 最多展示的行数
+
     def __init__(self, diff_lines: list[DiffLine], filename: str = "", **kwargs):
         self.diff_lines = diff_lines
         self.filename = filename
+        # 构造后 diff 内容不再变化：按 (id(diff_lines), filename) 缓存 Panel，滚动/重绘直接复用
+        self._cache_key: tuple[int, str] | None = None
+        self._cache_panel: Panel | None = None
         super().__init__(**kwargs)
 
     def render(self) -> Panel:
+        key = (id(self.diff_lines), self.filename)
+        if key != self._cache_key or self._cache_panel is None:
+            self._cache_key, self._cache_panel = key, self._build_panel()
+        return self._cache_panel
+
+    def _build_panel(self) -> Panel:
         text = Text()
-        for line in self.diff_lines:
-            if line.type == "add":
-                text.append(f"+ {line.content}\n", style="green")
-            elif line.type == "remove":
-                text.append(f"- {line.content}\n", style="red")
-            else:
-                text.append(f"  {line.content}\n", style="dim")
+        # 只构建前 _MAX_LINES 行（超大 diff 不必全部排版）；相邻同类型的行合并为一段，每段只 append 一次
+        shown = islice(self.diff_lines, self._MAX_LINES)
+        for kind, group in groupby(shown, key=lambda line: line.type):
+            prefix, style = _DIFF_STYLE.get(kind, _DIFF_CONTEXT_STYLE)
+            text.append("".join([f"{prefix}{line.content}\n" for line in group]), style=style)
+        hidden = len(self.diff_lines) - self._MAX_LINES
+        if hidden > 0:
+            text.append(f"... 还有 {hidden} 行未显示\n", style=_S_DIM)
         title = f"Diff: {self.filename}" if self.filename else "Diff"
         return Panel(text, title=title, border_style="cyan", expand=True)
 
 
 class BottomBar(Static):
+    """底部状态栏；静态部分（模型/目录/分支）与 token 计数分别缓存，只在对应 setter 中重建。"""
+
+    _TOKEN_REFRESH_DELAY = 0.1  # add_tokens 合并刷新的间隔（秒）
+
     def __init__(
         self,
         model: str = "",
@@ -421,6 +562,10 @@ class BottomBar(Static):
         self.git_branch = git_branch
         self.input_tokens = input_tokens
         self.output_tokens = output_tokens
+        self._prefix = self._build_prefix()
+        self._suffix = self._build_suffix()
+        self._text = self._prefix + self._suffix
+        self._refresh_pending = False  # add_tokens 已安排合并刷新
         super().__init__(**kwargs)
 
     def update_info(
@@ -431,48 +576,77 @@ class BottomBar(Static):
         input_tokens: int | None = None,
         output_tokens: int | None = None,
     ) -> None:
-        if model is not None:
-            self.model = model
-        if cwd is not None:
-            self.cwd = cwd
-        if git_branch is not None:
-            self.git_branch = git_branch
-        if input_tokens is not None:
-            self.input_tokens = input_tokens
-        if output_tokens is not None:
-            self.output_tokens = output_tokens
-        self.refresh()
+        # 只有取值真正变化的部分才重建；都没变时不重绘
+        prefix_changed = suffix_changed = False
+        if model is not None and model != self.model:
+            self.model, prefix_changed = model, True
+        if cwd is not None and cwd != self.cwd:
+            self.cwd, prefix_changed = cwd, True
+        if git_branch is not None and git_branch != self.git_branch:
+            self.git_branch, prefix_changed = git_branch, True
+        if input_tokens is not None and input_tokens != self.input_tokens:
+            self.input_tokens, suffix_changed = input_tokens, True
+        if output_tokens is not None and output_tokens != self.output_tokens:
+            self.output_tokens, suffix_changed = output_tokens, True
+        if prefix_changed:
+            self._prefix = self._build_prefix()
+        if suffix_changed:
+            self._suffix = self._build_suffix()
+        if prefix_changed or suffix_changed:
+            self._text = self._prefix + self._suffix
+            self.refresh()
 
     def add_tokens(self, input_delta: int = 0, output_delta: int = 0) -> None:
+        """累加 token 计数；流式输出时增量很密集，计数立即更新，重建与重绘按 _TOKEN_REFRESH_DELAY 合并"""
+        if not input_delta and not output_delta:
+            return
         self.input_tokens += input_delta
         self.output_tokens += output_delta
+        if not self.is_mounted:  # 未挂载时没有定时器，直接重建
+            self._flush_tokens()
+            return
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.set_timer(self._TOKEN_REFRESH_DELAY, self._flush_tokens)
+
+    def _flush_tokens(self) -> None:
+        self._refresh_pending = False
+        self._suffix = self._build_suffix()
+        self._text = self._prefix + self._suffix
         self.refresh()
 
-    def render(self) -> Text:
+    def _build_prefix(self) -> Text:
         text = Text()
-        text.append(" 📦 ", style="dim")
-        text.append(self.model or "N/A", style="cyan")
-        text.append("  │  ", style="dim")
+        text.append(" 📦 ", style=_S_DIM)
+        text.append(self.model or "N/A", style=_S_CYAN)
+        text.append("  │  ", style=_S_DIM)
 
-        text.append("📁 ", style="dim")
+        text.append("📁 ", style=_S_DIM)
         cwd_short = self.cwd
         if len(cwd_short) > 25:
             cwd_short = "..." + cwd_short[-22:]
-        text.append(cwd_short, style="green")
-        text.append("  │  ", style="dim")
+        text.append(cwd_short, style=_S_GREEN)
+        text.append("  │  ", style=_S_DIM)
 
-        text.append("🌿 ", style="dim")
-        text.append(self.git_branch or "N/A", style="magenta" if self.git_branch else "dim")
-        text.append("  │  ", style="dim")
+        text.append("🌿 ", style=_S_DIM)
+        text.append(self.git_branch or "N/A", style=_S_MAGENTA if self.git_branch else _S_DIM)
+        text.append("  │  ", style=_S_DIM)
+        return text
 
+    def _build_suffix(self) -> Text:
         # 说明：部分终端/字体对 emoji（如 ⬆️/⬇️）支持不佳，容易显示为方块或宽度异常；
         # 因此使用更通用的箭头字符。
-        text.append("↑", style="dim")
-        text.append(f"{self.input_tokens}", style="yellow")
-        text.append(" ↓", style="dim")
-        text.append(f"{self.output_tokens}", style="yellow")
+        text = Text()
+        text.append("↑", style=_S_DIM)
+        text.append(f"{self.input_tokens}", style=_S_YELLOW)
+        text.append(" ↓", style=_S_DIM)
+        text.append(f"{self.output_tokens}", style=_S_YELLOW)
         return text
 
+    def render(self) -> Text:
+        # 拼接结果随分段一起更新，重绘时直接复用
+        return self._text
+
 
 # 保留旧的 TodoDisplay 作为别名（向后兼容）
 TodoDisplay = TaskToolDisplay
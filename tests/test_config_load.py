@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import minicc.core.config as config_mod
+from minicc.core.models import Config, PromptCache, Provider
+
+
+@pytest.fixture
+def config_file(monkeypatch, tmp_path):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(config_mod, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(config_mod, "CONFIG_FILE", path)
+    monkeypatch.setattr(config_mod, "AGENTS_FILE", tmp_path / "AGENTS.md")
+    return path
+
+
+def test_load_config_trusted_fast_path_matches_validation(config_file):
+    data = {"provider": "openai", "model": "m", "prompt_cache": {"instructions": "1h"}}
+    config_file.write_text(json.dumps(data), encoding="utf-8")
+
+    fast = config_mod.load_config()
+    full = config_mod.load_config(validate=True)
+    assert fast == full
+    assert fast.provider is Provider.OPENAI
+    assert isinstance(fast.prompt_cache, PromptCache)
+    assert fast.prompt_cache.instructions == "1h"
+
+
+def test_load_config_falls_back_to_validation_on_bad_data(config_file):
+    config_file.write_text(json.dumps({"provider": "nope"}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        config_mod.load_config()
+
+
+def test_load_config_fast_path_checks_field_types(config_file):
+    # 类型不符时回退完整校验：可转换的值被规范化，而不是原样透传
+    config_file.write_text(json.dumps({"subagent_concurrency": "4", "response_cache": "yes"}), encoding="utf-8")
+    cfg = config_mod.load_config()
+    assert cfg.subagent_concurrency == 4 and cfg.response_cache is True
+
+    for data in ({"subagent_concurrency": 0}, {"model": 1}, {"prompt_cache": {"messages": "2h"}}):
+        config_file.write_text(json.dumps(data), encoding="utf-8")
+        with pytest.raises(ValueError):
+            config_mod.load_config()
+
+
+def test_config_is_frozen():
+    cfg = Config()
+    with pytest.raises(ValueError):
+        cfg.model = "x"  # type: ignore[misc]
+    assert cfg.model_copy(update={"model": "x"}).model == "x"
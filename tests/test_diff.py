@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import difflib
+import random
+import re
+
+import pytest
+
+from minicc.tools import common
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@$")
+
+
+def _apply(old: str, diff: str) -> str:
+    """把 unified diff 应用回 old，用于校验非 difflib 后端输出的正确性。"""
+    old_lines = old.splitlines(keepends=True)
+    lines = diff.splitlines(keepends=True)[2:]
+    out: list[str] = []
+    pos = 0
+    for line in lines:
+        m = _HUNK.match(line.rstrip("\n"))
+        if m:
+            start = int(m.group(1)) - (0 if m.group(2) == "0" else 1)
+            out.extend(old_lines[pos:start])
+            pos = start
+        elif line.startswith(" "):
+            out.append(old_lines[pos])
+            pos += 1
+        elif line.startswith("-"):
+            pos += 1
+        elif line.startswith("+"):
+            out.append(line[1:])
+    out.extend(old_lines[pos:])
+    return "".join(out)
+
+
+def _cases(count: int = 200) -> list[tuple[str, str]]:
+    rng = random.Random(7)
+    cases = []
+    for _ in range(count):
+        a = [rng.choice("abcdef") for _ in range(rng.randint(0, 30))]
+        b = list(a)
+        for _ in range(rng.randint(0, 4)):
+            i = rng.randint(0, len(b))
+            b[i : i + rng.randint(0, 3)] = [rng.choice("xyzab") for _ in range(rng.randint(0, 3))]
+        cases.append(("\n".join(a) + "\n", "\n".join(b) + "\n"))
+    return cases
+
+
+def test_unified_diff_matches_difflib_without_speedups(monkeypatch):
+    monkeypatch.setattr(common, "_Indel", None)
+    for old, new in _cases():
+        expected = "".join(
+            difflib.unified_diff(
+                old.splitlines(keepends=True),
+                new.splitlines(keepends=True),
+                fromfile="a/f.py",
+                tofile="b/f.py",
+            )
+        )
+        assert common.generate_unified_diff(old, new, filename="f.py") == expected
+
+
+@pytest.mark.skipif(common._Indel is None, reason="rapidfuzz 未安装")
+def test_unified_diff_rapidfuzz_roundtrip():
+    for old, new in _cases():
+        diff = common.generate_unified_diff(old, new, filename="f.py")
+        if old == new:
+            assert diff == ""
+            continue
+        assert diff.startswith("--- a/f.py\n+++ b/f.py\n@@ ")
+        assert _apply(old, diff) == new
+
+
+def test_diff_lines_follow_unified_diff_hunks(monkeypatch):
+    monkeypatch.setattr(common, "_Indel", None)
+    for old, new in _cases():
+        expected = []
+        for line in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm=""):
+            if line.startswith(("+++", "---", "@@")):
+                continue
+            kind = {"+": "add", "-": "remove"}.get(line[:1], "context")
+            expected.append((kind, line[1:]))
+        assert [(d.type, d.content) for d in common.generate_diff_lines(old, new)] == expected
@@ -33,3 +33,12 @@ async def test_event_bus_iter_yields_values():
     bus.emit("b")
     assert await asyncio.wait_for(task, timeout=1) == ["a", "b"]
 
+
+
+def test_event_bus_drain_returns_pending_without_waiting():
+    bus: EventBus[int] = EventBus()
+    assert bus.drain() == []
+    bus.emit(1)
+    bus.emit(2)
+    assert bus.drain() == [1, 2]
+    assert bus.drain() == []
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+
+from minicc.tui.app import _new_event_loop
+
+
+async def _echo() -> str:
+    proc = await asyncio.create_subprocess_exec("echo", "hi", stdout=asyncio.subprocess.PIPE)
+    out, _ = await proc.communicate()
+    return out.decode()
+
+
+def test_new_event_loop_works_with_textual_eager_tasks():
+    loop = _new_event_loop()
+    try:
+        # Textual 启动时会设置 eager_task_factory，返回的事件循环必须兼容
+        loop.set_task_factory(asyncio.eager_task_factory)
+        assert loop.run_until_complete(_echo()) == "hi\n"
+    finally:
+        loop.close()
+
+
+def test_new_event_loop_falls_back_without_uvloop(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    loop = _new_event_loop()
+    try:
+        assert isinstance(loop, asyncio.BaseEventLoop)
+    finally:
+        loop.close()
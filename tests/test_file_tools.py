@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from minicc.core.models import Config, MiniCCDeps, Provider
+from minicc.tools.common import relative_to_cwd, resolve_path
+from minicc.tools.file import _atomic_write, edit_file, read_file, write_file
+
+
+@dataclass
+class _Ctx:
+    deps: MiniCCDeps
+
+
+def _ctx(cwd) -> _Ctx:
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key")
+    return _Ctx(deps=MiniCCDeps(config=cfg, cwd=str(cwd), fs=None))
+
+
+@pytest.mark.asyncio
+async def test_read_file_streams_requested_window(tmp_path):
+    (tmp_path / "a.txt").write_text("".join(f"line{i}\r\n" for i in range(1, 11)), encoding="utf-8")
+    ctx = _ctx(tmp_path)
+
+    result = await read_file(ctx, "a.txt", offset=4, limit=3)
+    assert result.success
+    assert result.output.splitlines()[:3] == ["     4\tline4", "     5\tline5", "     6\tline6"]
+    assert result.output.endswith("还有更多行未显示")
+
+    # 恰好读到结尾时不提示还有更多
+    result = await read_file(ctx, "a.txt", offset=8, limit=3)
+    assert result.output == "     8\tline8\n     9\tline9\n    10\tline10"
+
+    result = await read_file(ctx, "a.txt", offset=50, limit=3)
+    assert result.output == "（文件为空或偏移超出范围）"
+
+
+@pytest.mark.asyncio
+async def test_read_file_splits_lines_like_splitlines(tmp_path):
+    content = "mac1\rmac2\rwin\r\nform\x0cfeed\u2028sep\n\nlast"
+    (tmp_path / "a.txt").write_bytes(content.encode("utf-8"))
+
+    result = await read_file(_ctx(tmp_path), "a.txt")
+    expected = content.splitlines()
+    assert result.output.split("\n") == [f"{i:6}\t{line}" for i, line in enumerate(expected, start=1)]
+
+    result = await read_file(_ctx(tmp_path), "a.txt", offset=2, limit=1)
+    assert result.output.startswith("     2\tmac2\n")
+
+
+@pytest.mark.asyncio
+async def test_edit_file_single_and_replace_all(tmp_path):
+    target = tmp_path / "a.py"
+    target.write_text("x = 1\ny = 1\nx = 1\n", encoding="utf-8")
+    ctx = _ctx(tmp_path)
+
+    result = await edit_file(ctx, "a.py", "x = 1", "x = 2")
+    assert not result.success
+    assert "2 次" in result.error
+
+    result = await edit_file(ctx, "a.py", "y = 1", "y = 2")
+    assert result.success
+    assert target.read_text(encoding="utf-8") == "x = 1\ny = 2\nx = 1\n"
+
+    result = await edit_file(ctx, "a.py", "x = 1", "x = 3", replace_all=True)
+    assert result.success
+    assert target.read_text(encoding="utf-8") == "x = 3\ny = 2\nx = 3\n"
+
+    # 空白容错匹配：只替换第一处
+    target.write_text("if a:\n\tb()   \nif a:\n\tb()\n", encoding="utf-8")
+    result = await edit_file(ctx, "a.py", "if a:\n    b()", "if a:\n    c()")
+    assert result.success
+    assert target.read_text(encoding="utf-8") == "if a:\n    c()\nif a:\n\tb()\n"
+
+
+@pytest.mark.asyncio
+async def test_edit_file_rejects_empty_old_string(tmp_path):
+    target = tmp_path / "a.py"
+    target.write_text("x = 1\n\ny = 1\n", encoding="utf-8")
+    ctx = _ctx(tmp_path)
+
+    result = await edit_file(ctx, "a.py", "", "z = 0")
+    assert not result.success
+    assert result.error == "old_string 不能为空"
+
+    # 只含空白的 old_string 规范化后为空，不能匹配到空行上
+    result = await edit_file(ctx, "a.py", "   ", "z = 0")
+    assert not result.success
+    assert "未找到" in result.error
+    assert target.read_text(encoding="utf-8") == "x = 1\n\ny = 1\n"
+
+
+@pytest.mark.asyncio
+async def test_write_file_is_atomic_and_keeps_mode(tmp_path):
+    target = tmp_path / "run.sh"
+    target.write_text("old\n", encoding="utf-8")
+    target.chmod(0o755)
+    (tmp_path / "link.sh").symlink_to(target)
+    ctx = _ctx(tmp_path)
+
+    result = await write_file(ctx, "link.sh", "新内容\n")
+    assert result.success
+    assert (tmp_path / "link.sh").is_symlink()
+    assert target.read_text(encoding="utf-8") == "新内容\n"
+    assert target.stat().st_mode & 0o777 == 0o755
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["link.sh", "run.sh"]
+
+    result = await write_file(ctx, "new/dir/f.txt", "x")
+    assert result.success
+    assert (tmp_path / "new/dir/f.txt").read_text(encoding="utf-8") == "x"
+
+
+def test_atomic_write_concurrent_writers_use_distinct_temp_files(tmp_path):
+    target = tmp_path / "a.txt"
+    contents = [f"writer {i}\n" * 1000 for i in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda c: _atomic_write(target, c), contents))
+    assert target.read_text(encoding="utf-8") in contents
+    assert [p.name for p in tmp_path.iterdir()] == ["a.txt"]
+
+
+@pytest.mark.asyncio
+async def test_edit_file_rejects_identical_strings_before_touching_disk(tmp_path):
+    result = await edit_file(_ctx(tmp_path), "missing.py", "same", "same")
+    assert not result.success
+    assert result.error == "new_string 必须与 old_string 不同"
+
+
+def test_relative_to_cwd_uses_prefix_match():
+    assert relative_to_cwd("/repo", Path("/repo/src/a.py")) == "src/a.py"
+    assert relative_to_cwd("/repo/", Path("/repo/a.py")) == "a.py"
+    assert resolve_path("/repo", "src/a.py") == Path("/repo/src/a.py")
+    with pytest.raises(ValueError):
+        relative_to_cwd("/repo", Path("/repository/a.py"))
+
+
+@pytest.mark.asyncio
+async def test_read_file_truncates_long_lines(tmp_path):
+    (tmp_path / "long.txt").write_text("x" * 2001 + "\nshort\n", encoding="utf-8")
+    result = await read_file(_ctx(tmp_path), "long.txt")
+    assert result.output == f"     1\t{'x' * 2000}...\n     2\tshort"
+
+
+class _LinesFS:
+    """只实现 read_lines 的最小 FileSystem，用于覆盖 agent_gear 分支。"""
+
+    def __init__(self, lines: list[str]):
+        self.lines = lines
+        self.calls: list[tuple[str, int, int]] = []
+
+    def read_lines(self, path: str, start_line: int, count: int) -> list[str]:
+        self.calls.append((path, start_line, count))
+        return self.lines[start_line : start_line + count]
+
+
+@pytest.mark.asyncio
+async def test_read_file_fs_probes_one_extra_line(tmp_path):
+    (tmp_path / "a.txt").write_text("", encoding="utf-8")
+    ctx = _ctx(tmp_path)
+    fs = _LinesFS([f"l{i}" for i in range(5)])
+    ctx.deps.fs = fs
+
+    result = await read_file(ctx, "a.txt", offset=1, limit=4)
+    assert fs.calls == [("a.txt", 0, 5)]
+    assert result.output.endswith("     4\tl3\n\n... 还有更多行未显示")
+
+    result = await read_file(ctx, "a.txt", offset=2, limit=4)
+    assert result.output == "     2\tl1\n     3\tl2\n     4\tl3\n     5\tl4"
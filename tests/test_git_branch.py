@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from minicc.tui.app import _find_git_dir, _read_git_branch
+
+
+def test_read_git_branch_from_head(tmp_path):
+    git_dir = tmp_path / ".git"
+    git_dir.mkdir()
+    (git_dir / "HEAD").write_text("ref: refs/heads/feature/x\n", encoding="utf-8")
+    sub = tmp_path / "a" / "b"
+    sub.mkdir(parents=True)
+
+    found = _find_git_dir(str(sub))
+    assert found == git_dir
+    assert _read_git_branch(found) == "feature/x"
+
+
+def test_read_git_branch_detached_and_worktree(tmp_path):
+    real_git_dir = tmp_path / "real"
+    real_git_dir.mkdir()
+    (real_git_dir / "HEAD").write_text("0123456789abcdef0123456789abcdef01234567\n", encoding="utf-8")
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / ".git").write_text(f"gitdir: {real_git_dir}\n", encoding="utf-8")
+
+    found = _find_git_dir(str(work))
+    assert found == real_git_dir
+    assert _read_git_branch(found) == "01234567"
+
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+from wcmatch import glob as wcglob
+
+from minicc.tools.search import _glob_fallback
+
+_FILES = [
+    "a.py",
+    "b.txt",
+    "src/x.py",
+    "src/sub/y.py",
+    "src/sub/deep/z.py",
+    "src/.hid/h.py",
+    ".github/w.yml",
+    "docs/r.md",
+    "docs/sub/q.md",
+    "a b/c.txt",
+    "node_modules/pkg/index.py",
+]
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["*.py", "**/*.py", "src/*.py", "src/**/*.py", "{src,docs}/**/*.{py,md}", ".github/*", "docs/**", "*/sub/*.py", "!(a).py", "*/", "**/", "src/**/", "*/sub/"],
+)
+def test_glob_fallback_matches_wcmatch(tmp_path, pattern):
+    for rel in _FILES:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.touch()
+
+    flags = wcglob.GLOBSTAR | wcglob.BRACE | wcglob.EXTGLOB
+    # 被忽略目录本身仍可匹配，只是不进入其中
+    matched = wcglob.glob(pattern, root_dir=str(tmp_path), flags=flags)
+    expected = sorted(m for m in matched if "node_modules/" not in m.rstrip("/"))
+    assert sorted(_glob_fallback(str(tmp_path), pattern)) == expected
+
+
+def test_glob_fallback_enters_ignored_dir_when_named(tmp_path):
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "index.py").touch()
+    assert _glob_fallback(str(tmp_path), "**/*.py") == []
+    assert _glob_fallback(str(tmp_path), "node_modules/**/*.py") == ["node_modules/pkg/index.py"]
+    assert _glob_fallback(str(tmp_path), "**/node_modules/*/*.py") == ["node_modules/pkg/index.py"]
+
+
+def test_glob_fallback_ignored_dir_needs_exact_segment(tmp_path):
+    for rel in (".gitignore", ".git/info/.gitignore", "venv_x.py", "venv/lib/venv_y.py"):
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.touch()
+    # 模式中只是包含 .git / venv 子串，不等于显式写出了这些目录
+    assert _glob_fallback(str(tmp_path), "**/.gitignore") == [".gitignore"]
+    assert _glob_fallback(str(tmp_path), "**/*venv*.py") == ["venv_x.py"]
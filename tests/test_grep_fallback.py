@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import shutil
+import sys
+from dataclasses import dataclass
+
+import pytest
+
+import minicc.tools.search as search
+from minicc.core.models import Config, MiniCCDeps, Provider
+from minicc.tools.search import _format_rg_event, _grep_fallback, _run_rg, grep_search
+
+
+@dataclass
+class _Ctx:
+    deps: MiniCCDeps
+
+
+def _ctx(cwd) -> _Ctx:
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key")
+    return _Ctx(deps=MiniCCDeps(config=cfg, cwd=str(cwd), fs=None))
+
+
+async def _grep(tmp_path, output_mode: str, head_limit: int | None = None):
+    return await _grep_fallback(
+        _ctx(tmp_path),
+        pattern="hel+o",
+        search_path=tmp_path,
+        glob="*.py",
+        output_mode=output_mode,
+        case_insensitive=False,
+        head_limit=head_limit,
+    )
+
+
+@pytest.mark.asyncio
+async def test_grep_fallback_scans_files_concurrently_in_sorted_walk_order(tmp_path):
+    for i in range(40):
+        (tmp_path / f"f{i}.py").write_text(f"x\nhello {i}\nhello\n", encoding="utf-8")
+    (tmp_path / "skip.txt").write_text("hello\n", encoding="utf-8")
+    (tmp_path / "bin.py").write_bytes(b"\xff\xfehello")
+
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.py").write_text("hello\n", encoding="utf-8")
+
+    walk = sorted(tmp_path / f"f{i}.py" for i in range(40))
+
+    result = await _grep(tmp_path, "files_with_matches")
+    assert result.output.split("\n") == [str(p) for p in walk]
+
+    result = await _grep(tmp_path, "count")
+    assert result.output.split("\n") == [f"{p}:2" for p in walk]
+
+    result = await _grep(tmp_path, "content", head_limit=3)
+    first = walk[0]
+    assert result.output.split("\n")[:2] == [f"{first}:2:hello {first.stem[1:]}", f"{first}:3:hello"]
+    assert result.output.endswith("... 还有更多结果")
+
+
+@pytest.mark.asyncio
+async def test_grep_fallback_stops_scanning_at_head_limit(tmp_path, monkeypatch):
+    for i in range(500):
+        (tmp_path / f"f{i:03d}.py").write_text("hello\n", encoding="utf-8")
+
+    scanned: list[str] = []
+    scan_one = search._scan_one
+
+    def counting_scan(path, regex, want_lines):
+        scanned.append(path.name)
+        return scan_one(path, regex, want_lines)
+
+    monkeypatch.setattr(search, "_scan_one", counting_scan)
+    result = await _grep(tmp_path, "files_with_matches", head_limit=2)
+    assert result.output.split("\n") == [str(tmp_path / "f000.py"), str(tmp_path / "f001.py"), "... 还有更多结果"]
+    assert len(scanned) <= 2 * search._GREP_CONCURRENCY
+
+
+def test_format_rg_json_events():
+    match = b'{"type":"match","data":{"path":{"text":"/r/a.py"},"lines":{"text":"hello\\n"},"line_number":3,"absolute_offset":10,"submatches":[]}}\n'
+    context = b'{"type":"context","data":{"path":{"bytes":"L3IvYi5weQ=="},"lines":{"text":"x\\r\\n"},"line_number":2,"absolute_offset":0,"submatches":[]}}\n'
+    assert _format_rg_event(match) == "/r/a.py:3:hello"
+    assert _format_rg_event(context) == "/r/b.py-2-x"
+    assert _format_rg_event(b'{"type":"begin","data":{"path":{"text":"/r/a.py"}}}') is None
+
+
+@pytest.mark.asyncio
+async def test_run_rg_skips_malformed_events():
+    match = '{"type":"match","data":{"path":{"text":"a.py"},"lines":{"text":"hello"},"line_number":1}}'
+    script = f"print('not json'); print('{{\"type\":\"match\"}}'); print({match!r})"
+    lines, has_more, error = await _run_rg([sys.executable, "-c", script], True, None)
+    assert lines == ["a.py:1:hello"] and has_more is False and error is None
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="未安装 ripgrep")
+@pytest.mark.asyncio
+async def test_grep_search_uses_rg_json_and_head_limit(tmp_path):
+    for i in range(5):
+        (tmp_path / f"f{i}.py").write_text("hello\nworld\nhello\n", encoding="utf-8")
+
+    result = await grep_search(_ctx(tmp_path), "hel+o", output_mode="content", head_limit=3)
+    lines = result.output.split("\n")
+    assert len(lines) == 4 and lines[-1] == "... 还有更多结果"
+    assert all(":hello" in line for line in lines[:3])
+
+    result = await grep_search(_ctx(tmp_path), "hel+o", output_mode="count")
+    assert sorted(result.output.split("\n")) == sorted(f"{tmp_path / f'f{i}.py'}:2" for i in range(5))
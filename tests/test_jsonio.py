@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from minicc.core import jsonio
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(jsonio, "orjson", None)
+    elif jsonio.orjson is None:
+        pytest.skip("orjson 未安装")
+    return request.param
+
+
+def test_jsonio_roundtrip_keeps_non_ascii(backend):
+    obj = {"语言": ["Python", "中文"], "n": 1}
+    text = jsonio.dumps(obj)
+    assert "中文" in text
+    assert jsonio.loads(text) == obj
+    assert jsonio.loads(text.encode("utf-8")) == obj
+    assert jsonio.dumps(obj, indent=True) == json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def test_jsonio_compact_output_matches_across_backends(backend):
+    assert jsonio.dumps({"a": 1, "b": [1, "x"]}) == '{"a":1,"b":[1,"x"]}'
+
+
+def test_jsonio_decode_error_is_stdlib_compatible(backend):
+    with pytest.raises(json.JSONDecodeError):
+        jsonio.loads("not json")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from rich.style import Style
+from textual.app import App, ComposeResult
+
+from minicc.core.models import DiffLine
+from minicc.tui.widgets import BottomBar, DiffView, MessagePanel, SubAgentLine, ToolCallLine
+
+
+def test_tool_call_line_reuses_render_until_status_changes():
+    line = ToolCallLine("read_file", {"file_path": "a/b.py"})
+    first = line.render()
+    assert line.render() is first
+    assert first.plain == "  🔧 read_file (a/b.py) 🔄"
+
+    line.status = "completed"
+    second = line.render()
+    assert second is not first
+    assert second.plain.endswith("✅")
+
+
+def test_sub_agent_line_reuses_render_until_status_changes():
+    line = SubAgentLine("t1", "x" * 60, "running")
+    first = line.render()
+    assert line.render() is first
+    assert first.plain == f"  🤖 {'x' * 50}... 🔄"
+
+    line.status = "failed"
+    assert line.render().plain.endswith("❌")
+
+
+def test_bottom_bar_rebuilds_only_changed_segment():
+    bar = BottomBar(model="m", cwd="/a/very/long/working/directory/path", git_branch="main")
+    prefix = bar._prefix
+    assert bar.render().plain == " 📦 m  │  📁 ...working/directory/path  │  🌿 main  │  ↑0 ↓0"
+
+    bar.add_tokens(3, 4)
+    assert bar._prefix is prefix
+    assert bar.render().plain.endswith("↑3 ↓4")
+
+    bar.update_info(git_branch="dev")
+    assert bar._prefix is not prefix
+    assert bar.render().plain == " 📦 m  │  📁 ...working/directory/path  │  🌿 dev  │  ↑3 ↓4"
+
+
+def test_diff_view_groups_consecutive_lines_by_type():
+    lines = [
+        DiffLine(type="context", content="a"),
+        DiffLine(type="remove", content="b"),
+        DiffLine(type="remove", content="c"),
+        DiffLine(type="add", content="B"),
+        DiffLine(type="context", content="d"),
+    ]
+    text = DiffView(lines, filename="x.py").render().renderable
+
+    assert text.plain == "  a\n- b\n- c\n+ B\n  d\n"
+    assert [(text.plain[s.start : s.end], s.style) for s in text.spans] == [
+        ("  a\n", Style.parse("dim")),
+        ("- b\n- c\n", Style.parse("red")),
+        ("+ B\n", Style.parse("green")),
+        ("  d\n", Style.parse("dim")),
+    ]
+
+
+def _count_refreshes(widget) -> list[int]:
+    calls: list[int] = []
+    widget.refresh = lambda *args, **kwargs: calls.append(1)
+    return calls
+
+
+def test_duplicate_status_updates_do_not_refresh():
+    tool_line = ToolCallLine("bash", {"command": "ls"})
+    agent_line = SubAgentLine("t1", "p", "running")
+    tool_calls, agent_calls = _count_refreshes(tool_line), _count_refreshes(agent_line)
+
+    tool_line.update_status("running")
+    agent_line.update_status("running")
+    assert tool_calls == [] and agent_calls == []
+
+    tool_line.update_status("completed")
+    agent_line.update_status("completed")
+    assert tool_calls == [1] and agent_calls == [1]
+
+
+def test_bottom_bar_skips_refresh_when_nothing_changed():
+    bar = BottomBar(model="m", cwd="/w", git_branch="main", input_tokens=1)
+    calls = _count_refreshes(bar)
+    prefix, suffix = bar._prefix, bar._suffix
+
+    bar.update_info(model="m", cwd="/w", git_branch="main", input_tokens=1)
+    bar.add_tokens()
+    assert calls == []
+    assert bar._prefix is prefix and bar._suffix is suffix
+
+    bar.update_info(model="m", input_tokens=2)
+    assert calls == [1]
+    assert bar._prefix is prefix and bar._suffix is not suffix
+
+
+def test_tool_call_line_summary_cached_per_args_object():
+    line = ToolCallLine("bash", {"command": "x" * 30})
+    assert line._get_summary() == f"({'x' * 25}...)"
+    assert line._summary_cache == (id(line.args), f"({'x' * 25}...)")
+
+    line.args = {"path": "p"}
+    assert line._get_summary() == "(p)"
+
+
+def test_diff_view_reuses_panel_for_same_lines():
+    view = DiffView([DiffLine(type="add", content="x")], filename="a.py")
+    first = view.render()
+    assert view.render() is first
+
+    view.diff_lines = [DiffLine(type="remove", content="y")]
+    second = view.render()
+    assert second is not first
+    assert second.renderable.plain == "- y\n"
+
+
+def test_diff_view_truncates_large_diffs(monkeypatch):
+    monkeypatch.setattr(DiffView, "_MAX_LINES", 3)
+    view = DiffView([DiffLine(type="add", content=str(i)) for i in range(5)])
+
+    assert view.render().renderable.plain == "+ 0\n+ 1\n+ 2\n... 还有 2 行未显示\n"
+
+
+def test_bottom_bar_render_reuses_joined_text():
+    bar = BottomBar(model="m", cwd="/w")
+    first = bar.render()
+    assert bar.render() is first
+
+    bar.add_tokens(1, 0)
+    assert bar.render() is not first
+    assert bar.render().plain.endswith("↑1 ↓0")
+
+
+class _BarApp(App):
+    def compose(self) -> ComposeResult:
+        yield BottomBar(model="m", cwd="/w", id="bar")
+
+
+@pytest.mark.asyncio
+async def test_bottom_bar_coalesces_streaming_token_updates():
+    async with _BarApp().run_test() as pilot:
+        bar = pilot.app.query_one("#bar", BottomBar)
+        await pilot.pause(0.05)
+        builds = 0
+        original = bar._build_suffix
+
+        def counting_build():
+            nonlocal builds
+            builds += 1
+            return original()
+
+        bar._build_suffix = counting_build
+        for _ in range(30):
+            bar.add_tokens(1, 2)
+            await asyncio.sleep(0)
+        assert (bar.input_tokens, bar.output_tokens) == (30, 60)
+        assert builds == 0
+
+        await pilot.pause(0.2)
+        assert builds == 1
+        assert bar.render().plain.endswith("↑30 ↓60")
+
+
+def test_message_panel_caches_markdown_per_content():
+    panel = MessagePanel("# hi", role="assistant")
+    first = panel.render()
+    assert panel.render() is first
+    assert first.title == "Assistant"
+
+    panel._content = "# bye"
+    second = panel.render()
+    assert second is not first
+    assert second.renderable.markup == "# bye"
+
+
+def test_message_panel_set_content_skips_identical_text():
+    panel = MessagePanel("a", role="assistant")
+    updates: list[str] = []
+    panel.update = updates.append
+
+    panel.set_content("a")
+    assert updates == []
+    panel.set_content("ab")
+    assert updates == ["ab"]
+
+
+def test_message_panel_resolves_role_style_once():
+    user = MessagePanel("x", role="user")
+    assert (user._border_color, user._title) == ("blue", "You")
+    panel = MessagePanel("x", role="tool")
+    assert (panel._border_color, panel._title) == ("white", "Tool")
+    assert panel.render().title == "Tool"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from datetime import datetime
+
+import minicc.core.log as log_mod
+from minicc.core.log import Logger
+
+
+def test_logger_writes_lines_and_closes(monkeypatch, tmp_path):
+    monkeypatch.setattr(Logger, "LOG_DIR", tmp_path)
+    logger = Logger("s1")
+    logger.print("hello")
+    logger.print("world")
+    logger.close()
+
+    lines = logger.log_file.read_text(encoding="utf-8").splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == ["hello", "world"]
+
+    # close 之后再写入应被忽略，且重复 close 不报错
+    logger.print("ignored")
+    logger.close()
+    assert len(logger.log_file.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_logger_flush_waits_for_background_writer(monkeypatch, tmp_path):
+    monkeypatch.setattr(Logger, "LOG_DIR", tmp_path)
+    logger = Logger("s2")
+    for i in range(100):
+        logger.print(f"line-{i}")
+    logger.flush()
+
+    lines = logger.log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 100
+    assert lines[-1].endswith("line-99")
+    logger.close()
+
+
+def test_logger_timestamp_format(monkeypatch, tmp_path):
+    monkeypatch.setattr(Logger, "LOG_DIR", tmp_path)
+    logger = Logger("s3")
+    logger.print("a")
+    logger.print("b")
+    logger.close()
+
+    for line in logger.log_file.read_text(encoding="utf-8").splitlines():
+        timestamp = line[1 : line.index("]")]
+        datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S.%f")
+        assert len(timestamp) == len("2025-01-01 00:00:00.000")
+
+
+def test_logger_stops_queueing_after_writer_failure(monkeypatch, tmp_path):
+    monkeypatch.setattr(Logger, "LOG_DIR", tmp_path)
+
+    class _BrokenFile:
+        def writelines(self, lines):
+            raise OSError("disk full")
+
+        def flush(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(log_mod, "open", lambda *args, **kwargs: _BrokenFile(), raising=False)
+    logger = Logger("s4")
+    logger.print("lost")
+    logger._writer.join(5)
+    assert not logger._writer.is_alive()
+
+    logger.print("dropped")
+    assert logger._q.empty()
+    logger.flush(timeout=None)  # 不会一直等待已退出的写线程
+    logger.close()
+
+
+def test_logger_flushes_on_interpreter_exit(tmp_path):
+    script = (
+        "from minicc.core.log import Logger\n"
+        f"Logger.LOG_DIR = __import__('pathlib').Path({str(tmp_path)!r})\n"
+        "logger = Logger('s5')\n"
+        "for i in range(1000):\n"
+        "    logger.print(f'line-{i}')\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
+    lines = (tmp_path / "s5" / Logger.LOG_FILE_NAME).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1000
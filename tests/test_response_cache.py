@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+import minicc.core.agent as agent_mod
+from minicc.core.models import Config, MiniCCDeps, Provider
+
+
+def _deps(response_cache: bool, cwd: str = "/tmp/minicc-test") -> MiniCCDeps:
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key", response_cache=response_cache)
+    return MiniCCDeps(config=cfg, cwd=cwd, fs=None)
+
+
+def _noop() -> str:
+    return ""
+
+
+class _CountingAgent:
+    def __init__(self, tools: tuple = ()) -> None:
+        self.calls = 0
+        self._agent = Agent(TestModel(custom_output_text="hi", call_tools=[]), deps_type=MiniCCDeps, tools=tools)
+        self.model = self._agent.model
+        self.toolsets = self._agent.toolsets
+
+    async def run(self, prompt, deps=None, message_history=None):
+        self.calls += 1
+        return await self._agent.run(prompt, deps=deps, message_history=message_history)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch):
+    monkeypatch.setattr(agent_mod, "_RESPONSE_CACHE", type(agent_mod._RESPONSE_CACHE)())
+    monkeypatch.setattr(agent_mod, "load_agents_prompt", lambda: "system")
+
+
+@pytest.mark.asyncio
+async def test_run_agent_response_cache_hits_for_identical_request():
+    agent = _CountingAgent()
+    deps = _deps(response_cache=True)
+
+    out1, msgs1 = await agent_mod.run_agent(agent, "P", deps)
+    out2, msgs2 = await agent_mod.run_agent(agent, "P", deps)
+    assert (out1, out2) == ("hi", "hi")
+    assert agent.calls == 1
+    assert len(msgs1) == len(msgs2)
+
+    await agent_mod.run_agent(agent, "P", deps, message_history=msgs1)
+    assert agent.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_run_agent_response_cache_disabled_by_default():
+    agent = _CountingAgent()
+    deps = _deps(response_cache=False)
+
+    await agent_mod.run_agent(agent, "P", deps)
+    await agent_mod.run_agent(agent, "P", deps)
+    assert agent.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_run_agent_response_cache_is_scoped_to_cwd_and_tools():
+    agent = _CountingAgent()
+    await agent_mod.run_agent(agent, "P", _deps(response_cache=True, cwd="/tmp/project-a"))
+    await agent_mod.run_agent(agent, "P", _deps(response_cache=True, cwd="/tmp/project-b"))
+    assert agent.calls == 2
+
+    with_tool = _CountingAgent(tools=(_noop,))
+    await agent_mod.run_agent(with_tool, "P", _deps(response_cache=True, cwd="/tmp/project-a"))
+    assert with_tool.calls == 1
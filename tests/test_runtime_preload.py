@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 from dataclasses import dataclass
 
 import pytest
 
 import minicc.core.runtime as runtime
 from minicc.core.models import Config, Provider
+from minicc.tools.common import load_fs
 
 
 @dataclass
@@ -24,7 +27,7 @@ def test_build_runtime_preloads_mcp_and_passes_toolsets(monkeypatch):
     monkeypatch.setattr(runtime, "load_mcp_toolsets", lambda cwd: toolsets)
     monkeypatch.setattr(runtime, "FileSystem", lambda cwd, auto_watch=True: _DummyFS(cwd=cwd, auto_watch=auto_watch))
 
-    def fake_create_agent(cfg, cwd, toolsets, register_tools):
+    def fake_create_agent(cfg, cwd, toolsets, tools):
         calls.append((cwd, toolsets))
         return object()
 
@@ -39,3 +42,97 @@ def test_build_runtime_preloads_mcp_and_passes_toolsets(monkeypatch):
     assert rt.deps.subagent_service is not None
     rt.deps.subagent_service.agent_factory()
     assert calls == [("/tmp/minicc-test", toolsets), ("/tmp/minicc-test", toolsets)]
+
+
+def test_subagent_factory_reuses_single_agent(monkeypatch):
+    created: list[object] = []
+
+    monkeypatch.setattr(runtime, "load_mcp_toolsets", lambda cwd: [])
+    monkeypatch.setattr(runtime, "FileSystem", lambda cwd, auto_watch=True: _DummyFS(cwd=cwd, auto_watch=auto_watch))
+
+    def fake_create_agent(cfg, cwd, toolsets, tools):
+        agent = object()
+        created.append(agent)
+        return agent
+
+    monkeypatch.setattr(runtime, "create_agent", fake_create_agent)
+
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key")
+    rt = runtime.build_runtime(config=cfg, cwd="/tmp/minicc-test")
+    factory = rt.deps.subagent_service.agent_factory
+
+    first = factory()
+    second = factory()
+    assert first is second
+    assert first is not rt.agent
+    assert len(created) == 2
+
+
+def test_subagent_concurrency_comes_from_config(monkeypatch):
+    monkeypatch.setattr(runtime, "load_mcp_toolsets", lambda cwd: [])
+    monkeypatch.setattr(runtime, "FileSystem", lambda cwd, auto_watch=True: _DummyFS(cwd=cwd, auto_watch=auto_watch))
+    monkeypatch.setattr(runtime, "create_agent", lambda cfg, cwd, toolsets, tools: object())
+
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key", subagent_concurrency=2)
+    rt = runtime.build_runtime(config=cfg, cwd="/tmp/minicc-test")
+    assert rt.deps.subagent_service.max_concurrency == 2
+    assert Config().subagent_concurrency == 4
+
+
+def test_generate_session_id_format():
+    from datetime import datetime
+
+    session_id = runtime._generate_session_id()
+    assert len(session_id) == len("20250101_000000_000000")
+    datetime.strptime(session_id, "%Y%m%d_%H%M%S_%f")
+
+
+def test_build_runtime_creates_filesystem_lazily(monkeypatch):
+    created: list[_DummyFS] = []
+    threads: list[int] = []
+
+    def fake_fs(cwd, auto_watch=True):
+        fs = _DummyFS(cwd=cwd, auto_watch=auto_watch)
+        fs.wait_ready = lambda timeout=None: True
+        created.append(fs)
+        threads.append(threading.get_ident())
+        return fs
+
+    monkeypatch.setattr(runtime, "load_mcp_toolsets", lambda cwd: [])
+    monkeypatch.setattr(runtime, "FileSystem", fake_fs)
+    monkeypatch.setattr(runtime, "create_agent", lambda cfg, cwd, toolsets, tools: object())
+
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key")
+    rt = runtime.build_runtime(config=cfg, cwd="/tmp/minicc-test")
+    assert created == []
+    assert rt.fs.loaded is False
+
+    # 属性访问不会在事件循环上触发创建
+    with pytest.raises(RuntimeError):
+        rt.deps.fs.cwd
+
+    fs = asyncio.run(load_fs(rt.deps))
+    assert fs is created[0] and rt.fs.loaded
+    assert threads != [threading.get_ident()]  # 在线程中创建
+    assert rt.deps.fs.cwd == "/tmp/minicc-test"
+    assert len(created) == 1
+    rt.close()
+    with pytest.raises(RuntimeError):
+        rt.fs.get()
+
+
+def test_lazy_filesystem_logs_index_failure():
+    messages: list[str] = []
+
+    class _Log:
+        def print(self, message: str) -> None:
+            messages.append(message)
+
+    def fail(timeout=None):
+        raise TimeoutError("index timed out")
+
+    dummy = _DummyFS(cwd="/tmp/minicc-test", auto_watch=True)
+    dummy.wait_ready = fail
+    lazy = runtime.LazyFileSystem(lambda: dummy, logger=_Log())  # type: ignore[arg-type]
+    assert lazy.get() is dummy
+    assert messages == ["[FS] Index not ready: TimeoutError: index timed out"]
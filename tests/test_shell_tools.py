@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from minicc.core import models
+from minicc.core.models import BackgroundShell, Config, MiniCCDeps, Provider
+from minicc.tools.common import MAX_OUTPUT_CHARS
+from minicc.tools import shell
+from minicc.tools.shell import ShellPool, bash, bash_output
+
+
+@dataclass
+class _Ctx:
+    deps: MiniCCDeps
+
+
+def _ctx(cwd) -> _Ctx:
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key")
+    return _Ctx(deps=MiniCCDeps(config=cfg, cwd=str(cwd), fs=None))
+
+
+def test_background_shell_buffer_drops_oldest_chunks(monkeypatch):
+    monkeypatch.setattr(models, "MAX_SHELL_OUTPUT_BYTES", 10)
+    shell = BackgroundShell(shell_id="s", command="c")
+    for chunk in (b"aaaa", b"bbbb", b"cccc", b"dd"):
+        shell.append_output(chunk)
+    assert shell.output_bytes == 10
+    assert shell.output_buffer == "... 早期输出已丢弃（4 字节）\nbbbbccccdd"
+
+
+@pytest.mark.asyncio
+async def test_background_bash_output_collects_chunks(tmp_path):
+    ctx = _ctx(tmp_path)
+    result = await bash(ctx, "printf 'ok 1\\nskip\\nok 2\\n'", run_in_background=True)
+    assert result.success
+    shell_id = next(iter(ctx.deps.background_shells))
+
+    for _ in range(100):
+        if not ctx.deps.background_shells[shell_id][1].is_running:
+            break
+        await asyncio.sleep(0.02)
+
+    result = await bash_output(ctx, shell_id, filter_pattern=r"^ok")
+    assert result.output == "[已完成]\nok 1\nok 2"
+
+
+@pytest.mark.asyncio
+async def test_bash_caps_captured_output(tmp_path):
+    ctx = _ctx(tmp_path)
+    result = await bash(ctx, "yes x | head -c 200000; echo err >&2")
+    assert result.success
+    stdout, _, tail = result.output.partition("\n... 输出已截断")
+    assert len(stdout) == MAX_OUTPUT_CHARS
+    assert tail == ""
+
+    # 上限按字符计：多字节字符不会被提前截断，也不会被切成半个
+    result = await bash(ctx, "python3 -c \"print('中' * 20000)\"")
+    assert result.output == "中" * 20000 + "\n"
+    result = await bash(ctx, "python3 -c \"print('中' * 40000)\"")
+    assert result.output == "中" * MAX_OUTPUT_CHARS + "\n... 输出已截断"
+
+    result = await bash(ctx, "echo hi; exit 3")
+    assert not result.success
+    assert result.output == "hi\n"
+    assert result.error == "退出码: 3"
+    await ctx.deps.shell_pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_bash_reuses_pooled_shell_without_leaking_state(tmp_path):
+    ctx = _ctx(tmp_path)
+    (tmp_path / "sub").mkdir()
+
+    first = await bash(ctx, "cd sub; export MINICC_X=1; echo $$ > ../pid; printf 'no newline'")
+    assert first.output == "no newline"
+    pool = ctx.deps.shell_pool
+    assert len(pool._idle) == 1
+
+    second = await bash(ctx, 'pwd; echo "x=${MINICC_X:-unset}"; echo err >&2; exit 4')
+    assert second.output == f"{tmp_path}\nx=unset\n\n[stderr]\nerr\n"
+    assert second.error == "退出码: 4"
+    assert len(pool._idle) == 1
+
+    # 语法错误只影响 eval 所在的子 shell，常驻 shell 仍可复用
+    third = await bash(ctx, "if")
+    assert not third.success
+    assert (await bash(ctx, "echo ok")).output == "ok\n"
+
+    result = await bash(ctx, "sleep 5", timeout=1000)
+    assert result.error == "命令执行超时（1.0秒）"
+    assert pool._idle == []
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_spawned_commands_read_stdin_from_devnull(tmp_path):
+    ctx = _ctx(tmp_path)
+    # 含 & 的命令不走常驻 shell；cat 读到的应是 /dev/null 而不是继承的 stdin
+    result = await bash(ctx, "true & cat", timeout=2000)
+    assert result.success
+    assert result.output == ""
+    assert ctx.deps.shell_pool is None
+
+
+class _FakeShell:
+    """只提供 ShellPool.run 用到的接口；stdout/stderr 预先写好 shell 的回显。"""
+
+    pid = 0
+    returncode = None
+
+    def __init__(self, stdout: bytes, stderr: bytes) -> None:
+        self.stdin = SimpleNamespace(write=lambda data: None, drain=self._noop)
+        self.stdout = asyncio.StreamReader()
+        self.stdout.feed_data(stdout)
+        self.stderr = asyncio.StreamReader()
+        self.stderr.feed_data(stderr)
+        self.reaped = False
+
+    async def _noop(self) -> None:
+        return None
+
+    def kill(self) -> None:
+        self.returncode = -9
+
+    async def wait(self) -> int:
+        self.reaped = True
+        return self.returncode
+
+
+@pytest.mark.asyncio
+async def test_shell_pool_drops_shell_with_data_after_token(monkeypatch, tmp_path):
+    monkeypatch.setattr(shell, "uuid4", lambda: SimpleNamespace(hex="t"))
+    token = b"__MINICC_DONE_t__"
+
+    clean = _FakeShell(b"out" + token + b"0\n", token)
+    pool = ShellPool(_idle=[clean])
+    assert await pool.run("x", cwd=str(tmp_path), timeout=1, cap=100) == (b"out", False, b"", False, 0)
+    assert pool._idle == [clean]
+
+    # 结束标记后还有输出：说明有脱离的子进程仍持有管道，该 shell 不再复用
+    leaky = _FakeShell(b"out" + token + b"0\nlate\n", token)
+    pool = ShellPool(_idle=[leaky])
+    assert await pool.run("x", cwd=str(tmp_path), timeout=1, cap=100) == (b"out", False, b"", False, 0)
+    assert pool._idle == []
+    assert leaky.reaped
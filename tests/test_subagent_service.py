@@ -78,3 +78,47 @@ async def test_subagent_service_background_tracks_task_and_cleans_up():
     assert task_id not in deps.sub_agent_tasks
     assert deps.sub_agents[task_id].status in ("completed", "failed")
 
+
+
+class _TrackingAgent:
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    async def run(self, prompt: str, deps=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return _DummyResult(output=prompt)
+
+
+@pytest.mark.asyncio
+async def test_subagent_service_bounds_concurrency():
+    deps = _make_deps()
+    agent = _TrackingAgent()
+    service = SubAgentService(deps=deps, event_bus=EventBus(), agent_factory=lambda: agent, max_concurrency=2)
+
+    for i in range(6):
+        await service.run(prompt=f"P{i}", description="D", background=True)
+    await asyncio.wait_for(asyncio.gather(*deps.sub_agent_tasks.values()), timeout=1)
+
+    assert agent.peak == 2
+    assert all(t.status == "completed" for t in deps.sub_agents.values())
+
+
+@pytest.mark.asyncio
+async def test_subagent_service_nested_spawn_does_not_deadlock():
+    deps = _make_deps()
+    service: SubAgentService
+
+    class _NestedAgent:
+        async def run(self, prompt: str, deps=None):
+            if prompt == "parent":
+                _, result = await service.run(prompt="child", description="C", background=False)
+                return _DummyResult(output=f"parent<{result}>")
+            return _DummyResult(output=prompt)
+
+    service = SubAgentService(deps=deps, event_bus=EventBus(), agent_factory=_NestedAgent, max_concurrency=1)
+    _, result = await asyncio.wait_for(service.run(prompt="parent", description="P"), timeout=1)
+    assert result == "parent<child>"
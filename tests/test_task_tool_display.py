@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pytest
+from rich.style import Style
+from textual.app import App, ComposeResult
+
+from minicc.core.models import TodoItem
+from minicc.tui import widgets
+from minicc.tui.widgets import TaskToolDisplay
+
+
+def test_in_progress_style_reads_precomputed_pulse_table():
+    display = TaskToolDisplay.__new__(TaskToolDisplay)  # 不挂载，只验证样式计算
+    period = display._PULSE_PERIOD
+    for step in range(widgets._PULSE_STEPS):
+        now = 1000 * period + (step + 0.5) * period / widgets._PULSE_STEPS
+        expected = widgets._pulse_style(0.65 + 0.35 * math.sin(2 * math.pi * step / widgets._PULSE_STEPS))
+        assert display._get_in_progress_style(now) == Style.parse(expected)
+
+
+
+def test_loading_dots_change_once_every_few_ticks():
+    display = TaskToolDisplay.__new__(TaskToolDisplay)
+    tick = display._ANIMATION_INTERVAL
+    dots = [display._get_loading_dots(1000 + (i + 0.5) * tick) for i in range(3 * display._DOTS_TICKS)]
+    changes = sum(a != b for a, b in zip(dots, dots[1:]))
+    assert changes == 2
+
+
+def test_render_reads_monotonic_clock_once(monkeypatch):
+    reads: list[int] = []
+    monkeypatch.setattr(widgets, "time", SimpleNamespace(monotonic=lambda: reads.append(1) or 12.3))
+    display = TaskToolDisplay()
+    display.tasks_with_tools = [
+        widgets.TaskWithTools(todo=TodoItem(content=c, status="in_progress", active_form="")) for c in ("A", "B")
+    ]
+    display._current_active_task_index = 0
+
+    text = display.render().renderable
+    assert reads == [1]
+    assert text.plain == "1. A.\n2. B.\n"
+
+
+def test_render_reuses_panel_until_frame_or_data_changes(monkeypatch):
+    now = [10.0]
+    monkeypatch.setattr(widgets, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    display = TaskToolDisplay()
+    display.update_todos([TodoItem(content="A", status="in_progress", active_form="")])
+
+    first = display.render()
+    assert display.render() is first
+
+    now[0] = 10.6  # 省略号变化 -> 新的一帧
+    second = display.render()
+    assert second is not first
+    assert display.render() is second
+
+    display.add_tool_call("c1", "bash", {"command": "ls"})
+    third = display.render()
+    assert third is not second
+    assert "bash" in third.renderable.plain
+
+
+class _App(App):
+    def compose(self) -> ComposeResult:
+        yield TaskToolDisplay(id="todo")
+
+
+@pytest.mark.asyncio
+async def test_animation_only_refreshes_while_a_task_is_in_progress():
+    async with _App().run_test() as pilot:
+        display = pilot.app.query_one("#todo", TaskToolDisplay)
+        refreshes = 0
+        original = display.refresh
+
+        def counting_refresh(*args, **kwargs):
+            nonlocal refreshes
+            refreshes += 1
+            return original(*args, **kwargs)
+
+        display.refresh = counting_refresh
+        display.update_todos([TodoItem(content="a", status="pending", active_form="")])
+        await pilot.pause(0.1)
+        refreshes = 0
+        await pilot.pause(0.3)
+        assert refreshes == 0
+
+        display.update_todos([TodoItem(content="a", status="in_progress", active_form="做 a")])
+        refreshes = 0
+        await pilot.pause(0.6)
+        # 只在脉冲样式/省略号变化时刷新：0.6s 内省略号至少变一次，但远少于每 50ms 一次
+        assert 1 <= refreshes < 12
+
+        # 任务结束后定时器暂停，不再刷新
+        display.update_todos([TodoItem(content="a", status="completed", active_form="")])
+        await pilot.pause(0.1)
+        refreshes = 0
+        await pilot.pause(0.3)
+        assert refreshes == 0
+
+
+def test_tool_index_follows_task_updates():
+    display = TaskToolDisplay()
+    display.update_todos(
+        [TodoItem(content="A", status="in_progress", active_form=""), TodoItem(content="B", status="pending", active_form="")]
+    )
+    display.add_tool_call("c1", "bash", None)
+    display.update_tool_call("c1", "completed")
+    assert display.tasks_with_tools[0].tools[0].status == "completed"
+    display.update_tool_call("missing", "failed")  # 未知 id 忽略
+
+    # A 保留（工具关联不丢），B 被移除
+    display.update_todos([TodoItem(content="A", status="completed", active_form="")])
+    assert display.tasks_with_tools[0].tools[0].tool_call_id == "c1"
+    assert "c1" in display._tool_index
+    assert display._current_active_task_index is None
+
+    display.update_todos([TodoItem(content="C", status="pending", active_form="")])
+    assert display._tool_index == {}
+    assert list(display._content_index) == ["C"]
+
+
+@pytest.mark.asyncio
+async def test_tool_events_are_coalesced_into_timer_refreshes():
+    async with _App().run_test() as pilot:
+        display = pilot.app.query_one("#todo", TaskToolDisplay)
+        display.update_todos([TodoItem(content="a", status="pending", active_form="")])
+        await pilot.pause(0.1)
+        refreshes = 0
+        original = display.refresh
+
+        def counting_refresh(*args, **kwargs):
+            nonlocal refreshes
+            refreshes += 1
+            return original(*args, **kwargs)
+
+        display.refresh = counting_refresh
+        for i in range(20):
+            display.add_tool_call(f"c{i}", "bash", {"command": str(i)})
+            await asyncio.sleep(0)
+            display.update_tool_call(f"c{i}", "completed")
+            await asyncio.sleep(0)
+        assert refreshes == 0
+
+        await pilot.pause(0.2)
+        assert refreshes == 1
+        assert "🟢" in display.render().renderable.plain
+
+
+def test_task_titles_use_status_styles():
+    display = TaskToolDisplay()
+    display.update_todos(
+        [TodoItem(content="done", status="completed", active_form=""), TodoItem(content="todo", status="pending", active_form="")]
+    )
+    text = display.render().renderable
+
+    styles = {text.plain[s.start : s.end]: s.style for s in text.spans}
+    assert styles["done\n"] == Style.parse("green")
+    assert styles["todo\n"] == Style.parse("dim")
+    assert styles["1. "] == styles["2. "] == Style.parse("dim")
+
+
+def test_tool_summary_computed_once_at_add_time():
+    display = TaskToolDisplay()
+    display.update_todos([TodoItem(content="A", status="in_progress", active_form="")])
+    display.add_tool_call("c1", "read_file", {"file_path": "x" * 30})
+
+    tool = display.tasks_with_tools[0].tools[0]
+    assert tool.summary == f"({'x' * 20}...)"
+    display._get_tool_summary = None  # 渲染不再重新计算摘要
+    assert f"read_file ({'x' * 20}...)" in display.render().renderable.plain
+
+
+def test_status_only_update_keeps_task_objects_and_index():
+    display = TaskToolDisplay()
+    display.update_todos(
+        [TodoItem(content="A", status="in_progress", active_form=""), TodoItem(content="B", status="pending", active_form="")]
+    )
+    tasks, index = display.tasks_with_tools, display._content_index
+
+    display.update_todos(
+        [TodoItem(content="A", status="completed", active_form=""), TodoItem(content="B", status="in_progress", active_form="")]
+    )
+    assert display.tasks_with_tools is tasks
+    assert display._content_index is index
+    assert [tw.todo.status for tw in tasks] == ["completed", "in_progress"]
+    assert display._current_active_task_index == 1
+
+    display.update_todos([TodoItem(content="B", status="completed", active_form="")])
+    assert [tw.todo.content for tw in display.tasks_with_tools] == ["B"]
+    assert list(display._content_index) == ["B"]
+    assert display._current_active_task_index is None
+
+
+def test_tool_calls_go_to_active_task_or_last_pending():
+    display = TaskToolDisplay()
+    display.update_todos(
+        [
+            TodoItem(content="A", status="completed", active_form=""),
+            TodoItem(content="B", status="pending", active_form=""),
+            TodoItem(content="C", status="pending", active_form=""),
+        ]
+    )
+    display.add_tool_call("c1", "bash", None)
+    assert [len(tw.tools) for tw in display.tasks_with_tools] == [0, 0, 1]
+
+    display.update_todos(
+        [
+            TodoItem(content="A", status="completed", active_form=""),
+            TodoItem(content="B", status="in_progress", active_form=""),
+            TodoItem(content="C", status="pending", active_form=""),
+        ]
+    )
+    display.add_tool_call("c2", "bash", None)
+    assert [len(tw.tools) for tw in display.tasks_with_tools] == [0, 1, 1]
+
+    display.update_todos([TodoItem(content="A", status="completed", active_form="")])
+    display.add_tool_call("c3", "bash", None)  # 没有可归属的任务：忽略
+    assert "c3" not in display._tool_index
+
+
+def test_tool_tree_lines():
+    display = TaskToolDisplay()
+    display.update_todos([TodoItem(content="A", status="in_progress", active_form="")])
+    display.add_tool_call("c1", "bash", {"command": "ls"})
+    display.add_tool_call("c2", "read_file", None)
+    display.update_tool_call("c1", "completed")
+
+    lines = display.render().renderable.plain.splitlines()
+    assert lines[1:] == ["├── 🟢 bash (ls)", "└── 🟠 read_file"]
+
+
+@pytest.mark.asyncio
+async def test_click_maps_rows_to_tasks():
+    display = TaskToolDisplay()
+    display.update_todos(
+        [TodoItem(content="A", status="in_progress", active_form=""), TodoItem(content="B", status="pending", active_form="")]
+    )
+    display.add_tool_call("c1", "bash", None)
+    display.add_tool_call("c2", "bash", None)
+    display.render()
+    assert display._task_line_ranges == [(0, 3), (3, 4)]
+
+    # y=0 是顶部边框；A 占第 1~3 行（标题 + 两个工具），B 在第 4 行
+    await display.on_click(SimpleNamespace(y=0))
+    assert [tw.expanded for tw in display.tasks_with_tools] == [True, True]
+    await display.on_click(SimpleNamespace(y=3))
+    assert [tw.expanded for tw in display.tasks_with_tools] == [False, True]
+    await display.on_click(SimpleNamespace(y=4))
+    assert [tw.expanded for tw in display.tasks_with_tools] == [False, False]
+    await display.on_click(SimpleNamespace(y=9))
+    assert [tw.expanded for tw in display.tasks_with_tools] == [False, False]
+
+    display.render()
+    assert display._task_line_ranges == [(0, 1), (1, 2)]
+
+
+@pytest.mark.asyncio
+async def test_hidden_panel_skips_animation_frames():
+    async with _App().run_test() as pilot:
+        display = pilot.app.query_one("#todo", TaskToolDisplay)
+        display.update_todos([TodoItem(content="a", status="in_progress", active_form="")])
+        await pilot.pause(0.1)
+        display.display = False
+        await pilot.pause(0.1)
+        refreshes = 0
+        original = display.refresh
+
+        def counting_refresh(*args, **kwargs):
+            nonlocal refreshes
+            refreshes += 1
+            return original(*args, **kwargs)
+
+        display.refresh = counting_refresh
+        await pilot.pause(0.6)
+        assert refreshes == 0
+
+        display.display = True
+        await pilot.pause(0.6)
+        assert refreshes >= 1
+
+
+def test_long_tool_lists_show_latest_calls_only(monkeypatch):
+    monkeypatch.setattr(TaskToolDisplay, "_MAX_VISIBLE_TOOLS", 2)
+    display = TaskToolDisplay()
+    display.update_todos([TodoItem(content="A", status="in_progress", active_form="")])
+    for i in range(5):
+        display.add_tool_call(f"c{i}", f"t{i}", None)
+
+    lines = display.render().renderable.plain.splitlines()
+    assert lines[1:] == ["├── … 更早的 3 个工具调用", "├── 🟠 t3", "└── 🟠 t4"]
+    assert display._task_line_ranges == [(0, 4)]
+
+
+def test_batch_refreshes_once_after_nested_updates():
+    display = TaskToolDisplay()
+    refreshes: list[int] = []
+    display.refresh = lambda *args, **kwargs: refreshes.append(1)
+
+    with display.batch():
+        display.update_todos([TodoItem(content="A", status="pending", active_form="")])
+        with display.batch():
+            display.toggle_task_expand(0)
+        display.update_todos([TodoItem(content="A", status="completed", active_form="")])
+        assert refreshes == []
+    assert refreshes == [1]
+
+    with display.batch():
+        pass
+    assert refreshes == [1]
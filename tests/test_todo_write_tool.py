@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pytest
+
+from minicc.core.events import EventBus, TodoUpdated
+from minicc.core.models import Config, MiniCCDeps, Provider
+from minicc.tools.task import todo_write
+
+
+@dataclass
+class _Ctx:
+    deps: MiniCCDeps
+
+
+class _RecordingLogger:
+    def __init__(self, bus: EventBus, order: list[str]):
+        self._bus = bus
+        self._order = order
+
+    def print(self, msg: str) -> None:
+        self._order.append("emitted" if self._bus._queue.qsize() else "log")
+
+
+def _deps() -> MiniCCDeps:
+    cfg = Config(provider=Provider.ANTHROPIC, model="test-model", api_key="test-key")
+    return MiniCCDeps(config=cfg, cwd="/tmp/minicc-test", fs=None)
+
+
+@pytest.mark.asyncio
+async def test_todo_write_emits_before_logging():
+    deps = _deps()
+    deps.event_bus = EventBus()
+    order: list[str] = []
+    deps.logger = _RecordingLogger(deps.event_bus, order)
+
+    result = await todo_write(
+        _Ctx(deps=deps),
+        [{"content": "A", "status": "in_progress", "active_form": "正在做 A"}, {"content": "B", "status": "pending"}],
+    )
+
+    assert result.success
+    assert order == ["emitted"]
+    ev = deps.event_bus._queue.get_nowait()
+    assert isinstance(ev, TodoUpdated)
+    assert [t.content for t in ev.todos] == ["A", "B"]
+    assert [t.content for t in deps.todos] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_todo_write_logs_input_on_failure():
+    deps = _deps()
+    lines: list[str] = []
+    deps.logger = type("L", (), {"print": lambda self, m: lines.append(m)})()
+
+    result = await todo_write(_Ctx(deps=deps), [{"content": "A", "status": "pending", "active_form": None}])
+
+    assert not result.success
+    assert len(lines) == 1 and "todo_write" in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_todo_write_summary_lists_each_todo_with_icon():
+    deps = _deps()
+    todos = [
+        {"content": "A", "status": "completed", "active_form": ""},
+        {"content": "B", "status": "in_progress", "active_form": "正在做 B"},
+        {"content": "C", "status": "weird", "active_form": ""},
+    ]
+
+    result = await todo_write(_Ctx(deps=deps), todos)
+
+    assert result.output == "已更新 3 个任务\n✅ A\n🔄 B\n? C"
+
+
+@pytest.mark.asyncio
+async def test_todo_write_empty_list_has_header_only():
+    deps = _deps()
+    await todo_write(_Ctx(deps=deps), [{"content": "A", "status": "completed", "active_form": ""}])
+
+    result = await todo_write(_Ctx(deps=deps), [])
+
+    assert result.output == "已更新 0 个任务"
+
+
+@pytest.mark.asyncio
+async def test_todo_write_unchanged_list_skips_event():
+    deps = _deps()
+    deps.event_bus = EventBus()
+    lines: list[str] = []
+    deps.logger = type("L", (), {"print": lambda self, m: lines.append(m)})()
+    todos = [{"content": "A", "status": "pending", "active_form": ""}]
+
+    await todo_write(_Ctx(deps=deps), todos)
+    first = deps.todos
+    deps.event_bus._queue.get_nowait()
+    lines.clear()
+
+    result = await todo_write(_Ctx(deps=deps), [dict(t) for t in todos])
+    assert result.success
+    assert result.output == "任务列表无变化（共 1 个任务）"
+    assert deps.todos is first
+    assert deps.event_bus._queue.empty()
+    assert lines == ["Invoke todo_write tool: unchanged (1 todos)"]
+
+    result = await todo_write(_Ctx(deps=deps), [{"content": "A", "status": "completed", "activeForm": ""}])
+    assert result.output == "已更新 1 个任务\n✅ A"
+    assert not deps.event_bus._queue.empty()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from pydantic_ai import Agent
+
+from minicc.core.models import MiniCCDeps
+from minicc.tools.registry import TOOL_FUNCTIONS, build_tools
+
+
+def test_build_tools_matches_table_and_shares_schema():
+    tools_a = build_tools()
+    tools_b = build_tools()
+    a: Agent = Agent("test", deps_type=MiniCCDeps, tools=tools_a)
+    b: Agent = Agent("test", deps_type=MiniCCDeps, tools=tools_b)
+
+    names = [f.__name__ for f in TOOL_FUNCTIONS]
+    assert [t.name for t in tools_a] == names
+    assert [t.name for t in tools_b] == names
+    assert a is not b
+
+    # 各 Agent 拿到独立的 Tool 对象，但复用同一份已生成的 schema
+    bash_a = tools_a[names.index("bash")]
+    bash_b = tools_b[names.index("bash")]
+    assert bash_a is not bash_b
+    assert bash_a.function_schema is bash_b.function_schema
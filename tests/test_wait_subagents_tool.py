@@ -69,3 +69,66 @@ async def test_task_wait_false_then_wait_subagents_returns_summary():
     assert "done:P1" in summary.output
     assert "done:P2" in summary.output
 
+
+
+class _SleepyAgent:
+    async def run(self, prompt: str, deps=None):
+        await asyncio.sleep(float(prompt))
+        return _DummyResult(output=f"slept:{prompt}")
+
+
+@pytest.mark.asyncio
+async def test_wait_subagents_reports_in_completion_order():
+    deps = _deps()
+    deps.subagent_service = SubAgentService(deps=deps, event_bus=EventBus(), agent_factory=lambda: _SleepyAgent())
+    ctx = _Ctx(deps=deps)
+
+    await task_tool(ctx, prompt="0.05", description="slow", wait=False)
+    await task_tool(ctx, prompt="0.01", description="fast", wait=False)
+
+    summary = await wait_subagents(ctx)
+    assert summary.output.index("fast") < summary.output.index("slow")
+    assert "slept:0.05" in summary.output
+
+
+@pytest.mark.asyncio
+async def test_wait_subagents_reports_each_finished_task_once():
+    deps = _deps()
+    deps.subagent_service = SubAgentService(deps=deps, event_bus=EventBus(), agent_factory=lambda: _SleepyAgent())
+    ctx = _Ctx(deps=deps)
+
+    await task_tool(ctx, prompt="0", description="earlier", wait=True)
+    await task_tool(ctx, prompt="0.01", description="background", wait=False)
+
+    summary = await wait_subagents(ctx)
+    assert summary.output.count("earlier") == 1
+    assert summary.output.count("background") == 1
+    # 本次等待的子任务按完成顺序写在前，之前已结束的随后补充
+    assert summary.output.index("background") < summary.output.index("earlier")
+
+
+@pytest.mark.asyncio
+async def test_wait_subagents_separates_blocks_with_blank_line():
+    deps = _deps()
+    deps.subagent_service = SubAgentService(deps=deps, event_bus=EventBus(), agent_factory=lambda: _SleepyAgent())
+    ctx = _Ctx(deps=deps)
+
+    t1 = (await task_tool(ctx, prompt="0.01", description="a", wait=False)).output.split("[")[1].split("]")[0]
+    t2 = (await task_tool(ctx, prompt="0.03", description="b", wait=False)).output.split("[")[1].split("]")[0]
+
+    summary = await wait_subagents(ctx)
+    assert summary.output == f"[{t1}] a (completed)\nslept:0.01\n\n[{t2}] b (completed)\nslept:0.03"
+
+
+@pytest.mark.asyncio
+async def test_wait_subagents_cancelled_only_returns_fallback():
+    deps = _deps()
+    deps.subagent_service = SubAgentService(deps=deps, event_bus=EventBus(), agent_factory=lambda: _SleepyAgent())
+    ctx = _Ctx(deps=deps)
+
+    await task_tool(ctx, prompt="10", description="slow", wait=False)
+    for handle in list(deps.sub_agent_tasks.values()):
+        handle.cancel()
+
+    summary = await wait_subagents(ctx)
+    assert summary.output == "子任务已结束（无可用结果）"
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import random
+
+from minicc.tools.common import find_whitespace_tolerant, normalize_whitespace
+
+
+def _reference(content: str, normalized_pattern: str) -> str | None:
+    content_lines = content.split("\n")
+    pattern_lines = normalized_pattern.split("\n")
+    for i in range(len(content_lines) - len(pattern_lines) + 1):
+        window = content_lines[i : i + len(pattern_lines)]
+        if "\n".join(normalize_whitespace(line) for line in window) == normalized_pattern:
+            return "\n".join(window)
+    return None
+
+
+def test_whitespace_tolerant_returns_original_slice():
+    content = "def f():\n\tx = 1   \n\treturn x\n"
+    match = find_whitespace_tolerant(content, normalize_whitespace("    x = 1\n    return x"))
+    assert match == "\tx = 1   \n\treturn x"
+    # 命中必须对齐行边界，行内子串不算
+    assert find_whitespace_tolerant("abc\n", "b") is None
+
+
+def test_whitespace_tolerant_matches_line_window_scan():
+    rng = random.Random(3)
+    pieces = ["a", "b", "ab", " a", "\tb", "a  ", "", "\t"]
+    for _ in range(500):
+        content = "\n".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        pattern = normalize_whitespace("\n".join(rng.choice(pieces) for _ in range(rng.randint(1, 3))))
+        assert find_whitespace_tolerant(content, pattern) == _reference(content, pattern)